@@ -1,12 +1,27 @@
 import openai
 import numpy as np
 import matplotlib.pyplot as plt
+import mmap
 import os
+import random
+import resource
+import shutil
+import sys
+import time
+from collections import deque
+from pathlib import Path
 from dotenv import load_dotenv
 import asyncio
 
 from chonkie import TokenChunker
 
+# Adds the above directory to the syspath for shared package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.embedding_cache import get_embedding_cache
+
+EMBED_MODEL = 'text-embedding-3-small'
+
 # client = openai.AsyncOpenAI()
 
 def openai_client():
@@ -20,39 +35,397 @@ def ollama_client():
     )
 
 async def embed(client, content: list[str]) -> np.array:
-    response = await client.embeddings.create(
-        input=content,
-        model='text-embedding-3-small'
-    )
-    return np.array([emb.embedding for emb in response.data])
-
-async def get_verses(client, content_embeds, context_verses, phrase, threshold = 0.6):
-    embedding = await embed(client, [phrase])
-    scores = content_embeds @ embedding.T
-    return np.array(context_verses)[scores.flatten() > threshold]
+    async def compute(texts):
+        response = await client.embeddings.create(
+            input=texts,
+            model=EMBED_MODEL
+        )
+        return [emb.embedding for emb in response.data]
+
+    return np.array(await get_embedding_cache().aembed(EMBED_MODEL, content, compute))
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+    return matrix
+
+
+class ChunkTexts:
+    """
+    Read-only view of chunk texts stored back to back in one UTF-8 file;
+    `offsets[i]:offsets[i + 1]` is the byte range of chunk i.
+    """
+
+    def __init__(self, text_path: Path, offsets: np.ndarray):
+        self.offsets = offsets
+        with open(text_path, 'rb') as file:
+            # mmap can't map an empty file
+            self._buf = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if offsets[-1] else b''
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _text(self, i: int) -> str:
+        return self._buf[self.offsets[i]:self.offsets[i + 1]].decode('utf-8')
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            return self._text(int(key))
+        texts = np.empty(len(key), dtype=object)
+        texts[:] = [self._text(int(i)) for i in key]
+        return texts
+
+
+def _select(scores: np.ndarray, k: int | None, threshold: float | None) -> np.ndarray:
+    """Positions of the top-k and/or above-threshold scores, best first."""
+    if k is not None and k <= 0:
+        return np.empty(0, dtype=np.intp)
+    if k is not None and k < len(scores):
+        idx = np.argpartition(scores, len(scores) - k)[len(scores) - k:]
+    elif threshold is not None:
+        idx = np.flatnonzero(scores > threshold)
+    else:
+        idx = np.arange(len(scores))
+
+    if threshold is not None and k is not None:
+        idx = idx[scores[idx] > threshold]
+
+    return idx[np.argsort(scores[idx])[::-1]]
+
+
+class VectorIndex:
+    """
+    Cosine-similarity index: one contiguous, pre-normalized float32 matrix plus
+    the matching texts. Built in memory, or loaded memory-mapped via `load`.
+
+    On-disk layout (a directory):
+      embeddings.npy  float32 (N, d), rows already normalized
+      chunks.txt      chunk texts concatenated as UTF-8
+      offsets.npy     int64 (N + 1,) byte offsets into chunks.txt
+    """
+
+    def __init__(self, embeddings, texts):
+        matrix = np.array(embeddings, dtype=np.float32, order='C')
+        if matrix.size == 0:
+            # No chunks: np.array([]) is 1-D, keep the (N, d) shape with N = 0
+            matrix = matrix.reshape(0, matrix.shape[1] if matrix.ndim == 2 else 0)
+        matrix = _normalize_rows(matrix)
+        object_texts = np.empty(len(texts), dtype=object)
+        object_texts[:] = texts
+        self._set(matrix, object_texts)
+
+    def _set(self, matrix, texts):
+        self.matrix = matrix
+        self.texts = texts
+        self._scores = np.empty((0, len(self)), dtype=np.float32)
+
+    def save(self, path: Path):
+        with VectorIndexWriter(path) as writer:
+            writer.add(self.matrix, self.texts)
+
+    @classmethod
+    def load(cls, path: Path, mmap_mode: str | None = 'r') -> 'VectorIndex':
+        """Open a saved index; with the default mmap_mode nothing is read until it is searched."""
+        path = Path(path)
+        index = cls.__new__(cls)
+        offsets = np.load(path / 'offsets.npy', mmap_mode=mmap_mode)
+        index._set(
+            np.load(path / 'embeddings.npy', mmap_mode=mmap_mode),
+            ChunkTexts(path / 'chunks.txt', offsets),
+        )
+        return index
+
+    def __len__(self):
+        return self.matrix.shape[0]
+
+    def _score(self, queries: np.ndarray) -> np.ndarray:
+        queries = _normalize_rows(np.array(queries, dtype=np.float32, ndmin=2))
+        if self._scores.shape[0] < len(queries):
+            # Grow-only buffer so repeated queries don't allocate a fresh N-sized array
+            self._scores = np.empty((len(queries), len(self)), dtype=np.float32)
+        scores = self._scores[:len(queries)]
+        np.matmul(queries, self.matrix.T, out=scores)
+        return scores
+
+    def search(self, queries, k: int | None = None, threshold: float | None = None) -> list[tuple[np.ndarray, np.ndarray]]:
+        """
+        For each query row return (indices, scores), best first.
+        `k` keeps the top k, `threshold` keeps scores strictly above it; both may be combined.
+        """
+        if len(self) == 0:
+            # Nothing to match; an empty index loaded from disk has d = 0, so skip the matmul
+            n_queries = len(np.array(queries, dtype=np.float32, ndmin=2))
+            return [(np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float32)) for _ in range(n_queries)]
+        results = []
+        for row in self._score(queries):
+            idx = _select(row, k, threshold)
+            results.append((idx, row[idx].copy()))
+        return results
+
+
+class IVFIndex:
+    """
+    Approximate search over a VectorIndex: spherical k-means splits the vectors
+    into `n_lists` cells and a query only scores the `n_probe` closest cells.
+    Raising n_probe trades speed for recall (n_probe == n_lists is exact).
+    """
+
+    def __init__(self, index: VectorIndex, n_lists: int | None = None, n_iter: int = 10,
+                 sample_size: int = 50_000, seed: int = 0):
+        self.index = index
+        n = len(index)
+        self.n_lists = max(1, min(n, n_lists or int(np.sqrt(n))))
+        rng = np.random.default_rng(seed)
+
+        sample_ids = np.sort(rng.choice(n, min(n, sample_size), replace=False))
+        sample = np.asarray(index.matrix[sample_ids], dtype=np.float32)
+        self.centroids = self._train(sample, n_iter, rng)
+
+        # Assign every vector in blocks so a memory-mapped matrix is streamed, not loaded
+        assignments = np.empty(n, dtype=np.int64)
+        for i in range(0, n, 65_536):
+            block = np.asarray(index.matrix[i:i + 65_536])
+            assignments[i:i + 65_536] = np.argmax(block @ self.centroids.T, axis=1)
+
+        # Inverted lists: ids of cell c are order[list_offsets[c]:list_offsets[c + 1]]
+        self.order = np.argsort(assignments, kind='stable')
+        self.list_offsets = np.zeros(self.n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(assignments, minlength=self.n_lists), out=self.list_offsets[1:])
+
+    def _train(self, sample: np.ndarray, n_iter: int, rng) -> np.ndarray:
+        centroids = sample[rng.choice(len(sample), self.n_lists, replace=False)].copy()
+        for _ in range(n_iter):
+            assign = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assign, sample)
+            counts = np.bincount(assign, minlength=self.n_lists)
+            # Re-seed empty cells from random sample points
+            empty = counts == 0
+            sums[empty] = sample[rng.choice(len(sample), int(empty.sum()))]
+            centroids = _normalize_rows(sums)
+        return centroids
+
+    def search(self, queries, k: int | None = None, threshold: float | None = None,
+               n_probe: int = 8) -> list[tuple[np.ndarray, np.ndarray]]:
+        """Same contract as VectorIndex.search, restricted to the n_probe nearest cells."""
+        queries = _normalize_rows(np.array(queries, dtype=np.float32, ndmin=2))
+        n_probe = min(n_probe, self.n_lists)
+        results = []
+        for query, cell_scores in zip(queries, queries @ self.centroids.T):
+            cells = np.argpartition(cell_scores, self.n_lists - n_probe)[self.n_lists - n_probe:]
+            candidates = np.sort(np.concatenate([
+                self.order[self.list_offsets[c]:self.list_offsets[c + 1]]
+                for c in cells
+            ]))
+            scores = self.index.matrix[candidates] @ query
+            idx = _select(scores, k, threshold)
+            results.append((candidates[idx], scores[idx]))
+        return results
+
+
+def recall_at_k(index: VectorIndex, ivf: IVFIndex, queries, k: int = 10, n_probe: int = 8) -> float:
+    """Fraction of the exact top-k that the IVF search also returns, averaged over queries."""
+    exact = index.search(queries, k=k)
+    approx = ivf.search(queries, k=k, n_probe=n_probe)
+    found = [
+        len(np.intersect1d(e_idx, a_idx)) / max(1, len(e_idx))
+        for (e_idx, _), (a_idx, _) in zip(exact, approx)
+    ]
+    return float(np.mean(found))
+
+
+class VectorIndexWriter:
+    """
+    Append-only writer for the VectorIndex directory layout, so an index can be
+    built batch by batch without holding all embeddings or texts in memory.
+    The directory only appears under its final name once `close` succeeds.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._tmp = self.path.with_name(self.path.name + '.tmp')
+        shutil.rmtree(self._tmp, ignore_errors=True)
+        self._tmp.mkdir(parents=True)
+        self._vectors = open(self._tmp / 'embeddings.f32', 'wb')
+        self._texts = open(self._tmp / 'chunks.txt', 'wb')
+        self._offsets = [0]
+        self._dim = 0
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def add(self, embeddings, texts):
+        matrix = _normalize_rows(np.array(embeddings, dtype=np.float32, order='C', ndmin=2))
+        if matrix.size:
+            self._dim = matrix.shape[1]
+        self._vectors.write(matrix.tobytes())
+        for text in texts:
+            data = text.encode('utf-8')
+            self._texts.write(data)
+            self._offsets.append(self._offsets[-1] + len(data))
+
+    def close(self):
+        self._vectors.close()
+        self._texts.close()
+
+        # Rewrap the raw float32 rows as an .npy in blocks to keep memory flat
+        n, raw_path = len(self), self._tmp / 'embeddings.f32'
+        out = np.lib.format.open_memmap(
+            self._tmp / 'embeddings.npy', mode='w+', dtype=np.float32, shape=(n, self._dim)
+        )
+        if n:
+            raw = np.memmap(raw_path, dtype=np.float32, mode='r', shape=(n, self._dim))
+            for i in range(0, n, 65_536):
+                out[i:i + 65_536] = raw[i:i + 65_536]
+            del raw
+        out.flush()
+        del out
+        raw_path.unlink()
+        np.save(self._tmp / 'offsets.npy', np.array(self._offsets, dtype=np.int64))
+
+        shutil.rmtree(self.path, ignore_errors=True)
+        self._tmp.rename(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self._vectors.close()
+            self._texts.close()
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+
+async def get_verses(client, index: VectorIndex, phrase, threshold = 0.6, k = None, ivf: IVFIndex | None = None, n_probe = 8):
+    return (await get_verses_batch(client, index, [phrase], threshold, k, ivf, n_probe))[0]
+
+
+async def get_verses_batch(client, index: VectorIndex, phrases: list[str], threshold = 0.6, k = None,
+                           ivf: IVFIndex | None = None, n_probe = 8):
+    # One embedding request and one matmul for every phrase; pass `ivf` for approximate search
+    embeddings = await embed(client, phrases)
+    if ivf is not None:
+        results = ivf.search(embeddings, k=k, threshold=threshold, n_probe=n_probe)
+    else:
+        results = index.search(embeddings, k=k, threshold=threshold)
+    return [index.texts[idx] for idx, _ in results]
 
 
-async def embed_token_batched(client, chunks, token_budget=250_000):
-    all_vecs = []
+def _token_batches(chunks, token_budget):
+    """Group chunks into batches whose token counts stay within `token_budget`."""
     batch, tok = [], 0
-
-    async def flush(batch_texts):
-        resp = await client.embeddings.create(model="text-embedding-3-small", input=batch_texts)
-        return [d.embedding for d in resp.data]
-
     for ch in chunks:
-        print(f"chunk {len(batch)} / {len(chunks)}")
         t = ch.token_count
         if batch and tok + t > token_budget:
-            all_vecs.extend(await flush(batch))
+            yield batch
             batch, tok = [], 0
-        batch.append(ch.text)
+        batch.append(ch)
         tok += t
-
     if batch:
-        all_vecs.extend(await flush(batch))
-
-    return np.array(all_vecs)
+        yield batch
+
+
+async def _embed_with_retry(client, texts, max_retries=6):
+    for attempt in range(max_retries + 1):
+        try:
+            resp = await client.embeddings.create(model=EMBED_MODEL, input=texts)
+            return [d.embedding for d in resp.data]
+        except openai.RateLimitError as e:
+            if attempt == max_retries:
+                raise
+            retry_after = e.response.headers.get('retry-after')
+            delay = float(retry_after) if retry_after else min(60.0, 2 ** attempt) * (1 + random.random())
+            print(f"Rate limited, retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+
+
+async def embed_token_batched(client, chunks, token_budget=250_000, concurrency=4):
+    """
+    Embed chunks in token-budgeted batches, with up to `concurrency` requests in flight.
+    Results keep the order of `chunks`.
+    """
+    cache = get_embedding_cache()
+    texts = [ch.text for ch in chunks]
+    now = time.time()  # shared by reads and writes so eviction keeps this run's hits
+    cached = cache.get_many(EMBED_MODEL, texts, now)
+    missing = [ch for ch, vec in zip(chunks, cached) if vec is None]
+    print(f"{len(chunks) - len(missing)} / {len(chunks)} chunks already embedded")
+
+    batches = list(_token_batches(missing, token_budget))
+    limit = asyncio.Semaphore(concurrency)
+    done = 0
+
+    async def run(batch):
+        nonlocal done
+        batch_texts = [ch.text for ch in batch]
+        async with limit:
+            vecs = await _embed_with_retry(client, batch_texts)
+        # Cache per batch so an interrupted run resumes where it stopped
+        cache.put_many(EMBED_MODEL, batch_texts, vecs, now)
+        done += 1
+        print(f"batch {done} / {len(batches)} ({len(batch)} chunks)")
+        return vecs
+
+    results = await asyncio.gather(*(run(batch) for batch in batches))
+    new_iter = (vec for vecs in results for vec in vecs)
+    return np.array([vec if vec is not None else next(new_iter) for vec in cached])
+
+
+def iter_text_pieces(path: Path, piece_chars: int = 1 << 20):
+    """Read a text file in ~piece_chars blocks, cut on line boundaries."""
+    with open(path, 'r') as file:
+        carry = ''
+        while block := file.read(piece_chars):
+            block = carry + block
+            cut = block.rfind('\n') + 1 or len(block)
+            carry = block[cut:]
+            yield block[:cut]
+        if carry:
+            yield carry
+
+
+def iter_chunks(path: Path, chunker, piece_chars: int = 1 << 20):
+    # Chunk overlap doesn't carry across piece boundaries; pieces end on a newline.
+    for piece in iter_text_pieces(path, piece_chars):
+        yield from chunker(piece)
+
+
+async def embed_stream(client, chunks, writer: VectorIndexWriter, token_budget=250_000, concurrency=4):
+    """
+    chunk -> batch -> embed -> store without materializing the chunk list.
+    At most `concurrency` batches are held in memory; they are written in order.
+    """
+    cache = get_embedding_cache()
+    in_flight = deque()
+    written = 0
+
+    async def run(batch):
+        texts = [ch.text for ch in batch]
+        vecs = await cache.aembed(EMBED_MODEL, texts, lambda missing: _embed_with_retry(client, missing))
+        return texts, vecs
+
+    async def write_oldest():
+        nonlocal written
+        texts, vecs = await in_flight.popleft()
+        writer.add(vecs, texts)
+        written += 1
+        print(f"batch {written} written ({len(writer)} chunks)")
+
+    for batch in _token_batches(chunks, token_budget):
+        in_flight.append(asyncio.create_task(run(batch)))
+        if len(in_flight) >= concurrency:
+            await write_oldest()
+    while in_flight:
+        await write_oldest()
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
 
 
 async def main():
@@ -96,36 +469,25 @@ async def main():
     # plt.ylim([0, 1]);
     # plt.show()
 
-    with open('shakespeare.txt', 'r') as file:
-        text = file.read()
-
-    print("Currently chunking...")
-    chunks = chunker(text)
-    print("Finished chunking")
-
-
-    # print(chunks)
-
-    chunk_list = []
-
-    for chunk in chunks:
-        # print(f"Chunk: {chunk.text}")
-        # print(f"Tokens: {chunk.token_count}")
-        chunk_list.append(chunk.text)
-
-    # print(chunk_list)
-
-    # content_embeds = await embed(client, chunk_list)
-
-    print("Currently embedding...")
-    content_embeds = await embed_token_batched(client, chunks)
-    print("Finished embedding")
+    index_dir = Path('shakespeare_index')
 
+    if index_dir.exists():
+        index = VectorIndex.load(index_dir)
+        print(f"Loaded {len(index)} chunks from {index_dir}")
+    else:
+        print("Currently chunking and embedding...")
+        start = time.perf_counter()
+        with VectorIndexWriter(index_dir) as writer:
+            await embed_stream(client, iter_chunks(Path('shakespeare.txt'), chunker), writer)
+        index = VectorIndex.load(index_dir)
+        print(
+            f"Finished embedding {len(index)} chunks in {time.perf_counter() - start:.1f}s "
+            f"(peak RSS {_peak_rss_mb():.0f} MB)"
+        )
 
     hits = await get_verses(
         client, 
-        content_embeds,
-        chunk_list, 
+        index,
         'bible', 
         # threshold=0.32
         threshold=0.2
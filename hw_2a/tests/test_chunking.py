@@ -0,0 +1,43 @@
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+from chunking import VectorIndex, _select
+
+
+class SelectTests(unittest.TestCase):
+    def test_non_positive_k_selects_nothing(self) -> None:
+        scores = np.array([0.1, 0.5, 0.3], dtype=np.float32)
+        self.assertEqual(len(_select(scores, 0, None)), 0)
+        self.assertEqual(len(_select(scores, -1, 0.2)), 0)
+        self.assertEqual(list(_select(scores, 2, None)), [1, 2])
+
+
+class EmptyVectorIndexTests(unittest.TestCase):
+    def assert_no_matches(self, index: VectorIndex) -> None:
+        self.assertEqual(len(index), 0)
+        results = index.search(np.ones((2, 3), dtype=np.float32), k=5)
+        self.assertEqual(len(results), 2)
+        for idx, scores in results:
+            self.assertEqual(len(idx), 0)
+            self.assertEqual(len(scores), 0)
+
+    def test_build_from_no_chunks(self) -> None:
+        self.assert_no_matches(VectorIndex([], []))
+
+    def test_load_saved_empty_index(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "index"
+            VectorIndex([], []).save(path)
+            self.assert_no_matches(VectorIndex.load(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Micro-benchmark: full __INITIAL_STATE__ parse vs. streaming contentStore scan.
+
+Usage:
+    python bench_initial_state.py <saved talk .html files or directories> [--repeat N]
+
+The talk URL of each page is taken from its <link rel="canonical">; pages without
+one are benchmarked against their last contentStore entry (the streaming worst case).
+"""
+
+import argparse
+import re
+import statistics
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from download_gc_talks import (
+    extract_initial_state,
+    extract_talk_from_html,
+    extract_talk_from_state,
+)
+
+CANONICAL_RE = re.compile(r'<link[^>]+rel="canonical"[^>]+href="([^"]+)"')
+
+
+def full_parse(html: str, url: str):
+    return extract_talk_from_state(extract_initial_state(html), url)
+
+
+def talk_url_for(html: str) -> str:
+    if match := CANONICAL_RE.search(html):
+        return match.group(1)
+    store = extract_initial_state(html).get("reader", {}).get("contentStore", {})
+    uris = [entry.get("uri", "") for entry in store.values() if isinstance(entry, dict)]
+    return uris[-1] if uris else ""
+
+
+def measure(fn: Callable, html: str, url: str, repeat: int) -> Tuple[float, int]:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(html, url)
+        times.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn(html, url)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(times), peak
+
+
+def collect(paths: List[str]) -> List[Path]:
+    files: List[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        files.extend(sorted(path.glob("*.htm*")) if path.is_dir() else [path])
+    return files
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'page':<40} {'full ms':>9} {'stream ms':>9} {'full KiB':>9} {'stream KiB':>10}")
+    totals = [0.0, 0.0, 0, 0]
+    mismatches = 0
+    for path in collect(args.paths):
+        html = path.read_text(encoding="utf-8", errors="replace")
+        url = talk_url_for(html)
+        if full_parse(html, url) != extract_talk_from_html(html, url):
+            mismatches += 1
+            print(f"MISMATCH {path}")
+
+        full_t, full_mem = measure(full_parse, html, url, args.repeat)
+        stream_t, stream_mem = measure(extract_talk_from_html, html, url, args.repeat)
+        for i, v in enumerate((full_t, stream_t, full_mem, stream_mem)):
+            totals[i] += v
+        print(
+            f"{path.name[:40]:<40} {full_t * 1e3:>9.2f} {stream_t * 1e3:>9.2f} "
+            f"{full_mem / 1024:>9.0f} {stream_mem / 1024:>10.0f}"
+        )
+
+    print(
+        f"{'total':<40} {totals[0] * 1e3:>9.2f} {totals[1] * 1e3:>9.2f} "
+        f"{totals[2] / 1024:>9.0f} {totals[3] / 1024:>10.0f}"
+    )
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -15,7 +15,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 from shared.usage import print_usage, format_usage_markdown
 
-from chroma_demo import query_whole_documents
+from chroma_demo import WholeDocumentRetriever
 
 
 # def openai_client():
@@ -63,18 +63,16 @@ class ChatAgent:
 
 
 async def _main_console(agent):
+    retriever = WholeDocumentRetriever(chroma_dir="./db", collection="confrence")
+    retriever.warm_up()
+
     while True:
         message = input('User: ')
         if not message:
             break
         # response = await agent.get_response(message, None)
 
-        docs = query_whole_documents(
-            collection="confrence",
-            chroma_dir="./db",
-            query=message,
-            n_results=2,            
-        )
+        docs = retriever.query(message, n_results=2)
 
         prompt = "The following documents are relevent to the question asked by the user:\n\n"
 
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Benchmark get_talk_text extraction: original extractor vs. each parser backend.
+
+Usage:
+    python bench_talk_text.py <saved talk .html files or directories> [--repeat N]
+
+The original extractor is html.parser with the old multi-pass _clean_text. Every
+backend's output must be byte-identical to it; mismatches are reported and make
+the script exit non-zero. Only enable TALK_TEXT_PARSER=lxml for pages that pass.
+"""
+
+import argparse
+import html
+import re
+import statistics
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, List
+
+import talk_text
+from talk_text import PARSERS, extract_talk_text
+
+
+def original_clean_text(s: str) -> str:
+    if s is None:
+        return ''
+    s = html.unescape(s)
+    s = s.replace('\u201c', '"').replace('\u201d', '"')
+    s = s.replace('\u2018', "'").replace('\u2019', "'")
+    s = s.replace('\u2014', ' \u2014 ').replace('\u2013', '-')
+    s = s.replace('\u00A0', ' ')
+    s = re.sub(r'[\x00-\x1f\x7f]', '', s)
+    s = re.sub(r'[ \t\v\f]+', ' ', s)
+    s = re.sub(r'\s*\n\s*', '\n', s)
+    s = s.strip()
+    return s
+
+
+@contextmanager
+def original_cleaner():
+    current = talk_text.clean_text
+    talk_text.clean_text = original_clean_text
+    try:
+        yield
+    finally:
+        talk_text.clean_text = current
+
+
+def original_extract(page: str) -> str:
+    with original_cleaner():
+        return extract_talk_text(page, "html.parser")
+
+
+def available_parsers() -> List[str]:
+    available = []
+    for parser in PARSERS:
+        try:
+            extract_talk_text("<p></p>", parser)
+        except Exception:  # bs4.FeatureNotFound when the parser is not installed
+            continue
+        available.append(parser)
+    return available
+
+
+def measure(fn: Callable[[str], str], page: str, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(page)
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def collect(paths: List[str]) -> List[Path]:
+    files: List[Path] = []
+    for raw in paths:
+        path = Path(raw)
+        files.extend(sorted(path.glob("*.htm*")) if path.is_dir() else [path])
+    return files
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    backends = available_parsers()
+    extractors = {"original": original_extract}
+    for backend in backends:
+        extractors[backend] = lambda page, backend=backend: extract_talk_text(page, backend)
+
+    print(f"{'page':<40}" + "".join(f" {name + ' ms':>16}" for name in extractors))
+    totals = dict.fromkeys(extractors, 0.0)
+    mismatches = 0
+    for path in collect(args.paths):
+        page = path.read_text(encoding="utf-8", errors="replace")
+        expected = original_extract(page)
+        for backend in backends:
+            if extract_talk_text(page, backend) != expected:
+                mismatches += 1
+                print(f"MISMATCH {backend} {path}")
+
+        row = f"{path.name[:40]:<40}"
+        for name, fn in extractors.items():
+            elapsed = measure(fn, page, args.repeat)
+            totals[name] += elapsed
+            row += f" {elapsed * 1e3:>16.2f}"
+        print(row)
+
+    print(f"{'total':<40}" + "".join(f" {t * 1e3:>16.2f}" for t in totals.values()))
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
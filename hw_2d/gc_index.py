@@ -0,0 +1,158 @@
+# Caches for the General Conference index tools in toolbot.py.
+#
+# The speaker index and per-speaker talk indexes change a few times a year, but the
+# model asks for them many times per conversation. TTLCache serves them from memory,
+# refreshes expired entries in the background while still answering with the stale
+# copy, and can persist to a JSON file so a restarted bot starts warm.
+import json
+import os
+import re
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Callable
+
+DEFAULT_PATH = Path.home() / ".cache" / "cs301r" / "gc_index.json"
+DEFAULT_TTL_SECONDS = 24 * 3600
+DEFAULT_STALE_SECONDS = 30 * 24 * 3600
+
+
+class TTLCache:
+    """
+    Values younger than `ttl_seconds` are fresh. Older values are served as-is for up
+    to `stale_seconds` more while one background thread reloads them; past that the
+    caller waits for the reload. Values must be JSON-serializable when persisting.
+    """
+
+    def __init__(
+            self,
+            ttl_seconds: float = DEFAULT_TTL_SECONDS,
+            stale_seconds: float = DEFAULT_STALE_SECONDS,
+            persist_path: str | Path | None = None,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.persist_path = Path(persist_path).expanduser() if persist_path else None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+        self._entries: dict[str, tuple[float, Any]] = {}  # key -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._key_locks: dict[str, threading.Lock] = {}
+        self._refreshing: set[str] = set()
+        if self.persist_path:
+            self._load_file()
+
+    def _load_file(self) -> None:
+        try:
+            data = json.loads(self.persist_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return
+        self._entries = {key: (stored_at, value) for key, (stored_at, value) in data.items()}
+
+    def _save_file(self) -> None:
+        with self._lock:
+            data = {key: [stored_at, value] for key, (stored_at, value) in self._entries.items()}
+        self.persist_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.persist_path.with_name(f"{self.persist_path.name}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.persist_path)
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _store(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+        if self.persist_path:
+            self._save_file()
+
+    def _load(self, key: str, load: Callable[[], Any]) -> Any:
+        # One loader per key; concurrent callers wait and reuse its result
+        with self._key_lock(key):
+            entry = self._entries.get(key)
+            if entry and time.time() - entry[0] < self.ttl_seconds:
+                return entry[1]
+            value = load()
+            self._store(key, value)
+            return value
+
+    def _refresh(self, key: str, load: Callable[[], Any]) -> None:
+        try:
+            self._load(key, load)
+        except Exception as exc:  # keep serving the stale copy
+            print(f"Warning: background refresh of {key!r} failed: {exc!r}")
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def get(self, key: str, load: Callable[[], Any]) -> Any:
+        entry = self._entries.get(key)
+        if entry:
+            stored_at, value = entry
+            age = time.time() - stored_at
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return value
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                with self._lock:
+                    start = key not in self._refreshing
+                    self._refreshing.add(key)
+                if start:
+                    threading.Thread(target=self._refresh, args=(key, load), daemon=True).start()
+                return value
+        self.misses += 1
+        return self._load(key, load)
+
+    def stored_at(self, key: str) -> float | None:
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, strip accents and punctuation: "Dieter F. Uchtdorf" -> "dieter f uchtdorf"."""
+    name = unicodedata.normalize("NFKD", name)
+    name = "".join(ch for ch in name if not unicodedata.combining(ch))
+    return " ".join(re.sub(r"[^a-z0-9 ]+", " ", name.lower()).split())
+
+
+class SpeakerIndex:
+    """In-memory lookup over the speaker index: exact name/slug dict hits, then prefix matches."""
+
+    def __init__(self, speakers: list[dict]):
+        self.speakers = speakers
+        self._exact: dict[str, dict] = {}
+        keys: list[tuple[str, int]] = []
+        for i, speaker in enumerate(speakers):
+            name = normalize_name(speaker["name"])
+            self._exact.setdefault(name, speaker)
+            self._exact.setdefault(speaker["url_name"], speaker)
+            # Index every word-boundary suffix so "uchtdorf" and "f uchtdorf" both match
+            words = name.split()
+            keys.extend((" ".join(words[j:]), i) for j in range(len(words)))
+        keys.sort()
+        self._keys = keys
+
+    def find(self, name: str, limit: int = 10) -> list[dict]:
+        query = normalize_name(name)
+        if not query:
+            return []
+        exact = self._exact.get(query) or self._exact.get(name.strip().lower())
+        if exact:
+            return [exact]
+
+        matches: list[dict] = []
+        seen = set()
+        i = bisect_left(self._keys, (query, -1))
+        while i < len(self._keys) and self._keys[i][0].startswith(query) and len(matches) < limit:
+            speaker_idx = self._keys[i][1]
+            if speaker_idx not in seen:
+                seen.add(speaker_idx)
+                matches.append(self.speakers[speaker_idx])
+            i += 1
+        return matches
@@ -0,0 +1,86 @@
+# Paging for long tool results.
+#
+# A tool result that would otherwise go into the conversation history whole (a talk,
+# a web page) is stored under a short handle and only its first page is returned. The
+# model reads further pages or a character range through companion tools, so later
+# requests only carry the parts it asked for.
+import threading
+from collections import OrderedDict
+
+PAGE_CHARS = 6000
+MAX_RESULTS = 64
+CHARS_PER_TOKEN = 4  # rough average for English text
+# Their output is already one page (plus a header) and is never paged again
+COMPANION_TOOLS = ("read_result_page", "read_result_slice")
+
+
+def estimate_tokens(text: str) -> int:
+    return -(-len(text) // CHARS_PER_TOKEN)
+
+
+def _page_starts(text: str, page_chars: int) -> list[int]:
+    """Page start offsets, breaking at a newline in the second half of a page when there is one."""
+    starts = [0]
+    while len(text) - starts[-1] > page_chars:
+        start = starts[-1]
+        cut = text.rfind("\n", start + page_chars // 2, start + page_chars)
+        starts.append(cut + 1 if cut != -1 else start + page_chars)
+    return starts
+
+
+class ResultPager:
+    def __init__(self, page_chars: int = PAGE_CHARS, max_results: int = MAX_RESULTS):
+        self.page_chars = page_chars
+        self.max_results = max_results
+        self._results: OrderedDict[str, tuple[str, str, list[int]]] = OrderedDict()  # handle -> (source, text, starts)
+        self._lock = threading.Lock()
+        self._next_id = 1
+
+    def paginate(self, source: str, text: str) -> str:
+        """`text` unchanged if it fits on one page, otherwise a handle header and the first page."""
+        if len(text) <= self.page_chars or source in COMPANION_TOOLS:
+            return text
+        result = (source, text, _page_starts(text, self.page_chars))
+        with self._lock:
+            handle = f"r{self._next_id}"
+            self._next_id += 1
+            self._results[handle] = result
+            while len(self._results) > self.max_results:
+                self._results.popitem(last=False)
+        return self._format_page(handle, result, 1)
+
+    def _get(self, handle: str) -> tuple[str, str, list[int]] | None:
+        with self._lock:
+            if handle in self._results:
+                self._results.move_to_end(handle)
+            return self._results.get(handle)
+
+    def _format_page(self, handle: str, result: tuple[str, str, list[int]], page: int) -> str:
+        # `result` was read under the lock; the handle may be evicted by now
+        source, text, starts = result
+        start = starts[page - 1]
+        end = starts[page] if page < len(starts) else len(text)
+        more = f' Call read_result_page("{handle}", {page + 1}) for the next page.' if page < len(starts) else ''
+        return (
+            f'[{source} result "{handle}": page {page} of {len(starts)}, characters {start}-{end} of {len(text)}.'
+            f'{more} Use read_result_slice("{handle}", start, length) for a specific range.]\n'
+            + text[start:end]
+        )
+
+    def page(self, handle: str, page: int) -> str:
+        result = self._get(handle)
+        if result is None:
+            return f'Unknown or expired result handle "{handle}". Call the original tool again.'
+        _, _, starts = result
+        if not 1 <= page <= len(starts):
+            return f'Result "{handle}" has pages 1 to {len(starts)}.'
+        return self._format_page(handle, result, page)
+
+    def slice(self, handle: str, start: int, length: int) -> str:
+        result = self._get(handle)
+        if result is None:
+            return f'Unknown or expired result handle "{handle}". Call the original tool again.'
+        _, text, _ = result
+        start = max(0, start)
+        end = min(len(text), start + max(0, min(length, self.page_chars)))
+        return f'[Result "{handle}": characters {start}-{end} of {len(text)}.]\n' + text[start:end]
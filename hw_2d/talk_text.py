@@ -0,0 +1,122 @@
+# Plain-text extraction for General Conference talk pages, used by toolbot.get_talk_text.
+#
+# BeautifulSoup uses the stdlib html.parser, which produced the original output.
+# lxml's C parser is faster but repairs malformed markup differently (e.g.
+# "<li>x<li>y", "<p>a<div>b</div>c</p>"), so it is opt-in: set TALK_TEXT_PARSER=lxml
+# after bench_talk_text.py reports no mismatches on your saved pages.
+import html
+import os
+import re
+
+from bs4 import BeautifulSoup
+
+PARSERS = ("html.parser", "lxml")
+DEFAULT_PARSER = os.getenv("TALK_TEXT_PARSER", "html.parser")
+
+# Smart quotes and special spaces are normalized and control characters (which
+# includes newlines and tabs) are dropped in a single translate pass
+_CLEAN_TABLE = str.maketrans(
+    {
+        "\u201c": '"',
+        "\u201d": '"',
+        "\u2018": "'",
+        "\u2019": "'",
+        "\u2014": " \u2014 ",
+        "\u2013": "-",
+        "\u00a0": " ",
+        **{chr(c): None for c in (*range(32), 127)},
+    }
+)
+_SPACES_RE = re.compile(r" {2,}")
+_AUTHOR_AID_RE = re.compile(r"^2885.*author")
+_FOOTNOTE_MARKER_RE = re.compile(r'^\s*\d+\s*$')
+
+
+def clean_text(s: str) -> str:
+    if s is None:
+        return ''
+    s = html.unescape(s).translate(_CLEAN_TABLE)
+    return _SPACES_RE.sub(' ', s).strip()
+
+
+def extract_talk_text(page_text: str, parser: str = DEFAULT_PARSER) -> str:
+    """Title, byline, kicker and body of a talk page, separated by blank lines."""
+    soup = BeautifulSoup(page_text, parser)
+
+    # Prefer the structured article for General Conference talk pages
+    article = (
+        soup.find("article", {"data-content-type": "general-conference-talk"})
+        or soup.find("article", id="main")
+        or soup.find("article")
+    )
+    if article is None:
+        # fallback: try to find the main content div
+        article = soup.find("div", class_="body") or soup
+
+    parts = []
+
+    # Title
+    title_tag = article.find("h1")
+    if title_tag:
+        parts.append(clean_text(title_tag.get_text(" ", strip=True)))
+
+    # Byline: author name / role
+    author_name = article.find(class_="author-name") or article.find(attrs={"data-aid": _AUTHOR_AID_RE})
+    if author_name:
+        parts.append(clean_text(author_name.get_text(" ", strip=True)))
+    author_role = article.find(class_="author-role")
+    if author_role:
+        parts.append(clean_text(author_role.get_text(" ", strip=True)))
+
+    # Kicker / intro
+    kicker = article.find(class_="kicker")
+    if kicker:
+        parts.append(clean_text(kicker.get_text(" ", strip=True)))
+
+    # Body: try to select the structured "body-block" region used on the site
+    body_block = article.select_one(".body-block") or article.find("div", class_="body") or article
+
+    # Walk relevant tags in-source order and extract text
+    # Keep headers (h2/h3/h4), paragraphs, and list items.
+    collected = []
+    for elem in body_block.find_all(["h2", "h3", "h4", "p", "li"], recursive=True):
+        # skip navigation/notes refs that sometimes appear as anchors or superscripts
+        # e.g., note-ref anchors are okay inside paragraphs but individual .note-ref elements alone are not desired
+        if elem.name == "p":
+            text = elem.get_text(" ", strip=True)
+            if not text:
+                continue
+            # Skip tiny footnote-only paragraphs if they look like a numbered footnote marker only
+            if _FOOTNOTE_MARKER_RE.fullmatch(text):
+                continue
+            collected.append(clean_text(text))
+        elif elem.name in ("h2", "h3", "h4"):
+            header_text = elem.get_text(" ", strip=True)
+            if header_text:
+                # mark headers with surrounding newlines for readability
+                collected.append(clean_text(header_text).upper())
+        elif elem.name == "li":
+            li_text = elem.get_text(" ", strip=True)
+            if li_text:
+                collected.append("- " + clean_text(li_text))
+
+    # If body extraction failed, as a fallback collect all visible text under article (minus nav/footer)
+    if not collected:
+        # get visible text and split by paragraphs
+        raw = article.get_text("\n", strip=True)
+        for block in raw.splitlines():
+            block = block.strip()
+            if block:
+                block = clean_text(block)
+                if block:
+                    collected.append(block)
+
+    # Combine header parts + collected body
+    # Insert a blank line between logical blocks
+    output_blocks = []
+    if parts:
+        output_blocks.append("\n".join(parts))
+    if collected:
+        output_blocks.append("\n\n".join(collected))
+
+    return "\n\n".join(output_blocks)
@@ -6,21 +6,32 @@ import asyncio
 import json
 import random
 import re
+import sys
 from pathlib import Path
-import html
 
 import gradio as gr
 from openai import AsyncOpenAI
 from openai.types.shared_params.reasoning import Reasoning
-import requests
+import httpx
 from bs4 import BeautifulSoup
 from urllib.parse import urljoin, urlparse
 
-from tools import ToolBox
+# Adds the above directory to the syspath for shared package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.http_cache import HttpCache
+from shared.http_client import get_http_client
+from gc_index import DEFAULT_PATH as DEFAULT_INDEX_PATH, DEFAULT_TTL_SECONDS, SpeakerIndex, TTLCache
+from paging import ResultPager, estimate_tokens
+from talk_text import extract_talk_text
+from tools import CachePolicy, ToolBox
 from usage import print_usage, format_usage_markdown
 from weather import get_weather
 
-our_tools = ToolBox()
+# Repeat calls with the same arguments are answered from memory for 10 minutes
+our_tools = ToolBox(cache=CachePolicy(ttl=600))
+# Tools that read state or must differ per call opt out
+NOT_CACHED = CachePolicy(idempotent=False)
 
 our_tools.tool(get_weather)
 
@@ -29,25 +40,51 @@ load_dotenv()
 
 BASE = "https://www.churchofjesuschrist.org"
 
+http_cache = HttpCache()
+# Speaker and talk indexes; reconfigured from the command line
+index_cache = TTLCache(persist_path=DEFAULT_INDEX_PATH)
+_speaker_lookup: SpeakerIndex | None = None
+# Long tool results are returned a page at a time; see read_result_page
+result_pager = ResultPager()
 
-@our_tools.tool
+
+def _cached_get(url: str, headers: dict | None = None, timeout: int = 15) -> str:
+    """GET through the shared on-disk cache, revalidating with ETag / Last-Modified."""
+    def send(extra_headers):
+        resp = get_http_client().get(url, headers={**(headers or {}), **extra_headers}, timeout=timeout)
+        return resp.status_code, resp.headers, resp.content
+
+    cached = http_cache.fetch(url, send)
+    if cached.status >= 400:
+        raise httpx.HTTPError(f"{cached.status} Error for url: {url}")
+    return cached.text()
+
+
+@our_tools.tool(cache=NOT_CACHED)
+def read_result_page(handle: str, page: int) -> str:
+    """Read a page (1-based) of a long tool result that was returned with a result handle."""
+    return result_pager.page(handle, page)
+
+
+@our_tools.tool(cache=NOT_CACHED)
+def read_result_slice(handle: str, start: int, length: int) -> str:
+    """Read `length` characters starting at character offset `start` of a long tool result with a result handle."""
+    return result_pager.slice(handle, start, length)
+
+
+@our_tools.tool(cache=NOT_CACHED)
 def get_random_number(lower: int, upper: int) -> int:
     """Get a random number"""
     return random.randint(lower, upper)
 
 @our_tools.tool
 def get_website_from_url(url: str) -> str:
-    """Get the python requests response from a website from the URL given"""
-    return requests.get(url).text
+    """Get the text of a website from the URL given"""
+    return get_http_client().get(url).text
 
-@our_tools.tool
-def get_gc_speaker_name_index() -> list[dict]:
-    """
-    Return a list of speakers from the GC speakers index as a JSON-serializable list.
-    Each item: {"name": "<display name>", "url_name": "<url slug>", "url": "<full url>"}
-    """
+def _scrape_speaker_index() -> list[dict]:
     url = "https://www.churchofjesuschrist.org/study/general-conference/speakers?lang=eng"
-    resp_text = requests.get(url, timeout=15).text
+    resp_text = _cached_get(url, timeout=15)
     soup = BeautifulSoup(resp_text, "html.parser")
 
     pattern = re.compile(r"^/study/general-conference/speakers/([^/?]+)")
@@ -88,14 +125,42 @@ def get_gc_speaker_name_index() -> list[dict]:
 
     return results
 
+
+@our_tools.tool
+def get_gc_speaker_name_index() -> list[dict]:
+    """
+    Return a list of speakers from the GC speakers index as a JSON-serializable list.
+    Each item: {"name": "<display name>", "url_name": "<url slug>", "url": "<full url>"}
+    """
+    return index_cache.get("speakers", _scrape_speaker_index)
+
+
+@our_tools.tool
+def find_gc_speaker(name: str) -> list[dict]:
+    """
+    Look up General Conference speakers by full name, last name, name prefix, or url slug
+    (e.g. "Uchtdorf", "dieter f", "d-todd-christofferson"). Much smaller than the full index.
+    Each item: {"name": "<display name>", "url_name": "<url slug>", "url": "<full url>"}
+    """
+    global _speaker_lookup
+    speakers = index_cache.get("speakers", _scrape_speaker_index)
+    if _speaker_lookup is None or _speaker_lookup.speakers is not speakers:
+        _speaker_lookup = SpeakerIndex(speakers)
+    return _speaker_lookup.find(name)
+
+
 @our_tools.tool
 def get_gc_speaker_talk_index(url_name: str) -> str:
+    talks = index_cache.get(f"talks:{url_name}", lambda: _scrape_speaker_talk_index(url_name))
+    return json.dumps(talks, ensure_ascii=False)
+
+
+def _scrape_speaker_talk_index(url_name: str) -> list[dict]:
     page_url = f"{BASE}/study/general-conference/speakers/{url_name}?lang=eng"
     headers = {"User-Agent": "gc-speaker-index-parser/1.0"}
-    resp = requests.get(page_url, headers=headers, timeout=15)
-    resp.raise_for_status()
+    page_text = _cached_get(page_url, headers=headers, timeout=15)
 
-    soup = BeautifulSoup(resp.text, "html.parser")
+    soup = BeautifulSoup(page_text, "html.parser")
     results = []
 
     # helper to make a safe debug print
@@ -173,28 +238,10 @@ def get_gc_speaker_talk_index(url_name: str) -> str:
         seen.add(key)
         deduped.append(item)
 
-    return json.dumps(deduped, ensure_ascii=False)
-
-
-def _clean_text(s: str) -> str:
-    if s is None:
-        return ''
-    # unescape HTML entities
-    s = html.unescape(s)
-    # normalize common "smart" quotes and special spaces
-    s = s.replace('\u201c', '"').replace('\u201d', '"')
-    s = s.replace('\u2018', "'").replace('\u2019', "'")
-    s = s.replace('\u2014', ' — ').replace('\u2013', '-')
-    s = s.replace('\u00A0', ' ')
-    # remove control characters
-    s = re.sub(r'[\x00-\x1f\x7f]', '', s)
-    # collapse whitespace
-    s = re.sub(r'[ \t\v\f]+', ' ', s)
-    s = re.sub(r'\s*\n\s*', '\n', s)
-    s = s.strip()
-    return s
+    return deduped
 
-@our_tools.tool
+
+@our_tools.tool(cache=CachePolicy(ttl=24 * 3600, max_entries=256))  # talks don't change once published
 def get_talk_text(talk_url: str, timeout: int = 15) -> str:
     """
     Fetch a General Conference talk page by the url and return the talk text as plain text.
@@ -209,89 +256,8 @@ def get_talk_text(talk_url: str, timeout: int = 15) -> str:
         text = get_talk_text("https://www.churchofjesuschrist.org/study/general-conference/2013/04/four-titles?lang=eng")
     """
     headers = {"User-Agent": "gc-talk-text-extractor/1.0 (+https://example.org)"}
-    resp = requests.get(talk_url, headers=headers, timeout=timeout)
-    resp.raise_for_status()
-
-    # Parse HTML
-    soup = BeautifulSoup(resp.text, "html.parser")
-
-    # Prefer the structured article for General Conference talk pages
-    article = (
-        soup.find("article", {"data-content-type": "general-conference-talk"})
-        or soup.find("article", id="main")
-        or soup.find("article")
-    )
-    if article is None:
-        # fallback: try to find the main content div
-        article = soup.find("div", class_="body") or soup
-
-    parts = []
-
-    # Title
-    title_tag = article.find("h1")
-    if title_tag:
-        parts.append(_clean_text(title_tag.get_text(" ", strip=True)))
-
-    # Byline: author name / role
-    author_name = article.find(class_="author-name") or article.find(attrs={"data-aid": re.compile(r"^2885.*author")})
-    if author_name:
-        parts.append(_clean_text(author_name.get_text(" ", strip=True)))
-    author_role = article.find(class_="author-role")
-    if author_role:
-        parts.append(_clean_text(author_role.get_text(" ", strip=True)))
-
-    # Kicker / intro
-    kicker = article.find(class_="kicker")
-    if kicker:
-        parts.append(_clean_text(kicker.get_text(" ", strip=True)))
-
-    # Body: try to select the structured "body-block" region used on the site
-    body_block = article.select_one(".body-block") or article.find("div", class_="body") or article
-
-    # Walk relevant tags in-source order and extract text
-    # Keep headers (h2/h3/h4), paragraphs, and list items.
-    collected = []
-    for elem in body_block.find_all(["h2", "h3", "h4", "p", "li"], recursive=True):
-        # skip navigation/notes refs that sometimes appear as anchors or superscripts
-        # e.g., note-ref anchors are okay inside paragraphs but individual .note-ref elements alone are not desired
-        if elem.name == "p":
-            text = elem.get_text(" ", strip=True)
-            if not text:
-                continue
-            # Skip tiny footnote-only paragraphs if they look like a numbered footnote marker only
-            if re.fullmatch(r'^\s*\d+\s*$', text):
-                continue
-            collected.append(_clean_text(text))
-        elif elem.name in ("h2", "h3", "h4"):
-            header_text = elem.get_text(" ", strip=True)
-            if header_text:
-                # mark headers with surrounding newlines for readability
-                collected.append(_clean_text(header_text).upper())
-        elif elem.name == "li":
-            li_text = elem.get_text(" ", strip=True)
-            if li_text:
-                collected.append("- " + _clean_text(li_text))
-
-    # If body extraction failed, as a fallback collect all visible text under article (minus nav/footer)
-    if not collected:
-        # get visible text and split by paragraphs
-        raw = article.get_text("\n", strip=True)
-        for block in raw.splitlines():
-            block = block.strip()
-            if block:
-                block = _clean_text(block)
-                if block:
-                    collected.append(block)
-
-    # Combine header parts + collected body
-    # Insert a blank line between logical blocks
-    output_blocks = []
-    if parts:
-        output_blocks.append("\n".join(parts))
-    if collected:
-        output_blocks.append("\n\n".join(collected))
-
-    return "\n\n".join(output_blocks)
+    page_text = _cached_get(talk_url, headers=headers, timeout=timeout)
+    return extract_talk_text(page_text)
 
 
 
@@ -313,6 +279,9 @@ class ChatAgent:
 
         self.usage = []
         self.usage_markdown = format_usage_markdown(self.model, [])
+        # Tokens kept out of each request by paging the tool results currently in history
+        self._paged_tokens_per_request = 0
+        self.saved_input_tokens = 0
 
         self._history = []
         self._prompt = prompt
@@ -323,6 +292,7 @@ class ChatAgent:
         self._history.append({'role': 'user', 'content': user_message})
 
         while True:
+            self.saved_input_tokens += self._paged_tokens_per_request
             response = await self._ai.responses.create(
                 input=self._history,
                 model=self.model,
@@ -331,11 +301,12 @@ class ChatAgent:
             )
 
             self.usage.append(response.usage)
-            self.usage_markdown = format_usage_markdown(self.model, self.usage)
+            self.usage_markdown = format_usage_markdown(self.model, self.usage, self.saved_input_tokens)
             self._history.extend(
                 response.output
             )
 
+            calls = []
             for item in response.output:
                 if item.type == 'reasoning':
                     for chunk in item.summary:
@@ -350,17 +321,11 @@ class ChatAgent:
                     print(f"Debugging: The model requested a function called {item.name} with arguments {item.arguments}.")
                     print(f"===============================")
 
-                    func = our_tools.get_tool_function(item.name)
-                    args = json.loads(item.arguments)
-                    result = func(**args) # type: ignore
-                    self._history.append({
-                        'type': 'function_call_output',
-                        'call_id': item.call_id,
-                        'output': str(result)
-                    })
-                    yield 'reasoning', str(result)
+                    calls.append(item)
 
                 elif item.type == 'message':
+                    async for text_type, text in self._run_calls(calls):
+                        yield text_type, text
                     for chunk in item.content:
                         txt = getattr(chunk, 'text', None)
                         if txt is not None:
@@ -375,11 +340,31 @@ class ChatAgent:
                                 yield 'output', str(chunk)
                     return
 
+            async for text_type, text in self._run_calls(calls):
+                yield text_type, text
+
+    async def _run_calls(self, calls):
+        """Run a turn's function calls concurrently, recording outputs in call order."""
+        results = await our_tools.call_all(calls)
+        for item, result in zip(calls, results):
+            output = result_pager.paginate(item.name, result)
+            self._paged_tokens_per_request += estimate_tokens(result) - estimate_tokens(output)
+            self._history.append({
+                'type': 'function_call_output',
+                'call_id': item.call_id,
+                'output': output
+            })
+            yield 'reasoning', output
+        calls.clear()
+
     def __enter__(self):
         return self
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        print_usage(self.model, self.usage)
+        print_usage(self.model, self.usage, saved_input_tokens=self.saved_input_tokens)
+        for name, stats in our_tools.cache_stats().items():
+            if stats['hits'] or stats['misses']:
+                print(f"Tool cache {name}: {stats['hits']} hits, {stats['misses']} misses", file=sys.stderr)
 
 
 async def _main_console(agent_args):
@@ -493,5 +478,11 @@ if __name__ == "__main__":
     parser.add_argument('--model', default='gpt-5-nano')
     parser.add_argument('--show-reasoning', action='store_true')
     parser.add_argument('--reasoning-effort', default='low')
+    parser.add_argument('--index-ttl', type=float, default=DEFAULT_TTL_SECONDS,
+                        help='Seconds before speaker/talk indexes are refreshed in the background')
+    parser.add_argument('--index-cache', type=Path, default=DEFAULT_INDEX_PATH,
+                        help='File the speaker/talk indexes persist to between runs')
+    parser.add_argument('--no-index-cache', action='store_true', help='Keep the indexes in memory only')
     args = parser.parse_args()
+    index_cache = TTLCache(args.index_ttl, persist_path=None if args.no_index_cache else args.index_cache)
     main(args.prompt_file, args.model, args.show_reasoning, args.reasoning_effort, args.web)
@@ -1,4 +1,12 @@
+import asyncio
+import contextvars
 import inspect
+import json
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from types import UnionType
 from typing import Any, Callable, get_type_hints, Literal, get_origin, get_args, Union
 
@@ -79,17 +87,159 @@ def generate_function_schema(func: Callable[..., Any]) -> FunctionToolParam:
     }
 
 
+@dataclass(frozen=True)
+class CachePolicy:
+    ttl: float | None = None  # seconds a result is reused; None keeps it until evicted
+    max_entries: int = 128
+    idempotent: bool = True  # False for tools whose result changes per call (random numbers, user input)
+
+
+class ResultCache:
+    """LRU of one tool's outputs keyed by the canonical JSON of its arguments."""
+
+    def __init__(self, policy: CachePolicy):
+        self.policy = policy
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()  # key -> (stored_at, output)
+
+    @staticmethod
+    def key(args: dict) -> str:
+        return json.dumps(args, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+
+    def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is not None and (self.policy.ttl is None or time.monotonic() - entry[0] < self.policy.ttl):
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+        if entry is not None:
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key: str, output: str) -> None:
+        self._entries[key] = (time.monotonic(), output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.policy.max_entries:
+            self._entries.popitem(last=False)
+
+
+class _Slot:
+    """
+    One held unit of the ToolBox's concurrency limit. Released once: when the call
+    returns, or, for a sync tool that timed out, when its worker thread finishes.
+    """
+
+    def __init__(self, semaphore: asyncio.Semaphore):
+        self._semaphore = semaphore
+        self._loop = asyncio.get_running_loop()
+        self.handed_off = False  # the worker thread releases it
+
+    def release(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+            self._semaphore = None
+
+    def release_from_thread(self, _future=None) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self.release)
+        except RuntimeError:
+            pass  # the event loop is closed; its semaphore is gone with it
+
+
 class ToolBox:
     tools: list[FunctionToolParam]
 
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 4, timeout: float = 60, cache: CachePolicy | None = None):
         self._funcs = {}
+        self._timeouts: dict[str, float] = {}
+        self._caches: dict[str, ResultCache] = {}
         self.tools = []
-
-    def tool(self, func):
+        self.max_concurrency = max_concurrency  # tool calls running at once, across turns
+        self.timeout = timeout  # seconds, unless the tool sets its own
+        self.cache = cache  # result caching for tools that don't declare their own policy
+        # Sync tools run here; a timed-out thread keeps its worker and its slot until it ends
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="tool")
+        # Semaphores are bound to the event loop they are used on, so each loop gets its own
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def tool(self, func=None, *, timeout: float | None = None, cache: CachePolicy | None = None):
+        if func is None:
+            return lambda f: self.tool(f, timeout=timeout, cache=cache)
         self._funcs[func.__name__] = func
+        if timeout is not None:
+            self._timeouts[func.__name__] = timeout
+        policy = cache or self.cache
+        if policy and policy.idempotent:
+            self._caches[func.__name__] = ResultCache(policy)
         self.tools.append(generate_function_schema(func))
         return func
 
+    def cache_stats(self) -> dict[str, dict[str, int]]:
+        return {
+            name: {'hits': cache.hits, 'misses': cache.misses}
+            for name, cache in self._caches.items()
+        }
+
     def get_tool_function(self, tool_name: str) -> Callable | None:
         return self._funcs.get(tool_name)
+
+    async def call(self, tool_name: str, arguments: str) -> str:
+        """
+        Run one tool call and return its output as a string. Sync tools run in a worker
+        thread so the event loop (and Gradio) stays responsive. A timed-out call is
+        reported to the model; its thread is left to finish in the background and
+        counts against max_concurrency until it does. Any other failure (unknown tool,
+        bad JSON arguments, an exception in the tool) is reported the same way, so
+        every call in the turn gets an output.
+        """
+        if tool_name not in self._funcs:
+            return f"Error: unknown tool {tool_name!r}."
+        timeout = self._timeouts.get(tool_name, self.timeout)
+        semaphore = self._semaphore()
+        await semaphore.acquire()
+        slot = _Slot(semaphore)
+        try:
+            return await self._run(tool_name, arguments, timeout, slot)
+        except TimeoutError:
+            return f"Error: {tool_name} did not finish within {timeout:g} seconds."
+        except Exception as exc:
+            return f"Error: {tool_name} failed: {exc!r}"
+        finally:
+            if not slot.handed_off:
+                slot.release()
+
+    def _semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if (semaphore := self._semaphores.get(loop)) is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def _run(self, tool_name: str, arguments: str, timeout: float, slot: _Slot) -> str:
+        func = self._funcs[tool_name]
+        args = json.loads(arguments)
+        cache = self._caches.get(tool_name)
+        if cache is not None:
+            key = cache.key(args)
+            if (output := cache.get(key)) is not None:
+                return output
+
+        if inspect.iscoroutinefunction(func):
+            pending = func(**args)
+        else:
+            # copy_context keeps contextvars visible in the thread, as asyncio.to_thread does
+            future = self._executor.submit(contextvars.copy_context().run, func, **args)
+            slot.handed_off = True
+            future.add_done_callback(slot.release_from_thread)
+            pending = asyncio.wrap_future(future)
+        output = str(await asyncio.wait_for(pending, timeout))
+        if cache is not None:
+            cache.put(key, output)
+        return output
+
+    async def call_all(self, calls: list) -> list[str]:
+        """Run the function calls from one model turn concurrently; outputs are in call order."""
+        return await asyncio.gather(*(self.call(call.name, call.arguments) for call in calls))
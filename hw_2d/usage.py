@@ -38,7 +38,7 @@ def _aggregate_usage(usages):
     return total
 
 
-def print_usage(model, usage, file=sys.stderr):
+def print_usage(model, usage, file=sys.stderr, saved_input_tokens=0):
     print(' Usage '.center(30, '-'), file=file)
     print('Model:', model, file=file)
 
@@ -55,8 +55,12 @@ def print_usage(model, usage, file=sys.stderr):
     else:
         print('Total cost: n/a (pricing unavailable for model)', file=file)
 
+    if saved_input_tokens:
+        saved_cost = _calculate_cost_usd(model, {'input': saved_input_tokens, 'cached': 0, 'output': 0})
+        print(f'Input saved by paging (est. tokens): {saved_input_tokens} (${saved_cost:.6f})', file=file)
 
-def format_usage_markdown(model, usage) -> str:
+
+def format_usage_markdown(model, usage, saved_input_tokens=0) -> str:
     total_usage = _aggregate_usage(usage)
     cost = _calculate_cost_usd(model, total_usage)
     token_table = '\n'.join(
@@ -72,4 +76,7 @@ def format_usage_markdown(model, usage) -> str:
         + token_table +
         f"\n\n**Total cost**: ${cost:.6f}\n"
     )
+    if saved_input_tokens:
+        saved_cost = _calculate_cost_usd(model, {'input': saved_input_tokens, 'cached': 0, 'output': 0})
+        out += f"\n**Input saved by paging** (est.): {saved_input_tokens} tokens, ${saved_cost:.6f}\n"
     return out
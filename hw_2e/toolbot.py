@@ -4,7 +4,6 @@
 import argparse
 import asyncio
 import io
-import json
 import sys
 from pathlib import Path
 
@@ -29,7 +28,7 @@ our_tools = ToolBox()
 #
 # # if you want to try executing code in the container from the docker directory use this
 from codebot import execute_code
-our_tools.tool(execute_code)
+our_tools.tool(execute_code, timeout=600)  # the container enforces the script timeout
 
 def _exec_python(code) -> tuple[str, str]:
     out_buffer = io.StringIO()
@@ -115,6 +114,7 @@ class ChatAgent:
                 response.output
             )
 
+            calls = []
             for item in response.output:
                 if item.type == 'reasoning':
                     for chunk in item.summary:
@@ -122,18 +122,11 @@ class ChatAgent:
 
                 elif item.type == 'function_call':
                     yield 'reasoning', f'{item.name}({item.arguments})'
-
-                    func = our_tools.get_tool_function(item.name)
-                    args = json.loads(item.arguments)
-                    result = func(**args) # pyright: ignore[reportOptionalCall]
-                    self._history.append({
-                        'type': 'function_call_output',
-                        'call_id': item.call_id,
-                        'output': str(result)
-                    })
-                    yield 'reasoning', str(result)
+                    calls.append(item)
 
                 elif item.type == 'message':
+                    async for text_type, text in self._run_calls(calls):
+                        yield text_type, text
 
                     print('')
                     print("==================")
@@ -147,6 +140,21 @@ class ChatAgent:
                     print("==================")
                     return
 
+            async for text_type, text in self._run_calls(calls):
+                yield text_type, text
+
+    async def _run_calls(self, calls):
+        """Run a turn's function calls concurrently, recording outputs in call order."""
+        results = await our_tools.call_all(calls)
+        for item, result in zip(calls, results):
+            self._history.append({
+                'type': 'function_call_output',
+                'call_id': item.call_id,
+                'output': result
+            })
+            yield 'reasoning', result
+        calls.clear()
+
     def __enter__(self):
         return self
 
@@ -4,7 +4,6 @@
 import argparse
 import asyncio
 import io
-import json
 import os
 import sys
 from pathlib import Path
@@ -107,6 +106,7 @@ class ChatAgent:
                 response.output
             )
 
+            calls = []
             for item in response.output:
                 if item.type == 'reasoning':
                     for chunk in item.summary:
@@ -114,23 +114,31 @@ class ChatAgent:
 
                 elif item.type == 'function_call':
                     yield 'reasoning', f'{item.name}({item.arguments})'
-
-                    func = our_tools.get_tool_function(item.name)
-                    args = json.loads(item.arguments)
-                    result = func(**args) # pyright: ignore[reportOptionalCall]
-                    self._history.append({
-                        'type': 'function_call_output',
-                        'call_id': item.call_id,
-                        'output': str(result)
-                    })
-                    yield 'reasoning', str(result)
+                    calls.append(item)
 
                 elif item.type == 'message':
+                    async for text_type, text in self._run_calls(calls):
+                        yield text_type, text
                     for chunk in item.content:
                         if (chunk.type == 'output_text'):
                             yield 'output', chunk.text
                     return
 
+            async for text_type, text in self._run_calls(calls):
+                yield text_type, text
+
+    async def _run_calls(self, calls):
+        """Run a turn's function calls concurrently, recording outputs in call order."""
+        results = await our_tools.call_all(calls)
+        for item, result in zip(calls, results):
+            self._history.append({
+                'type': 'function_call_output',
+                'call_id': item.call_id,
+                'output': result
+            })
+            yield 'reasoning', result
+        calls.clear()
+
     def __enter__(self):
         return self
 
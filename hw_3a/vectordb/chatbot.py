@@ -15,7 +15,7 @@ sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
 
 from shared.usage import print_usage, format_usage_markdown
 
-from chroma_demo import query_whole_documents
+from chroma_demo import WholeDocumentRetriever
 
 
 # def openai_client():
@@ -63,6 +63,9 @@ class ChatAgent:
 
 
 async def _main_console(agent):
+    retriever = WholeDocumentRetriever(chroma_dir="./db", collection="confrence")
+    retriever.warm_up()
+
     while True:
         message = input('User: ')
         if not message:
@@ -84,12 +87,7 @@ query the vector database to help answer the user's question
 
         print(f"Query Agent: {query_request}")
 
-        docs = query_whole_documents(
-            collection="confrence",
-            chroma_dir="./db",
-            query=query_request,
-            n_results=2,            
-        )
+        docs = retriever.query(query_request, n_results=2)
 
         print("Returned Docs:", docs)
         print("\n\n")
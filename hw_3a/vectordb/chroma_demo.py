@@ -1,16 +1,31 @@
 #
 # pip install chromadb openai langchain-text-splitters
 #
-from functools import wraps
+from collections import OrderedDict
+from functools import cache, wraps
+import asyncio
+import gzip
+import hashlib
+import json
 import os
+import sys
+import time
+import zlib
 from pathlib import Path
-from typing import Iterable, Any
+from typing import Callable, Iterable, Any
+from urllib.parse import urlparse
 
 import chromadb
 from chromadb.utils.embedding_functions import OpenAIEmbeddingFunction
 from dotenv import load_dotenv
+from openai import AsyncOpenAI
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 
+# Adds the above directory to the syspath for shared package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from shared.embedding_cache import EmbeddingCache, get_embedding_cache
+
 TEXT_EXTS = {
     ".txt", ".md", ".rst",
     ".py", ".js", ".ts", ".java", ".go", ".rs",
@@ -26,10 +41,315 @@ def iter_files(root: Path) -> Iterable[Path]:
 
 
 def read_text(p: Path) -> str:
+    return decode_text(p.read_bytes())
+
+
+def decode_text(data: bytes) -> str:
     try:
-        return p.read_text(encoding="utf-8")
+        return data.decode("utf-8")
     except UnicodeDecodeError:
-        return p.read_text(encoding="utf-8", errors="ignore")
+        return data.decode("utf-8", errors="ignore")
+
+
+def _root_key(root: Path) -> str:
+    """Short id of a resolved source folder; unique even when folder names repeat."""
+    return hashlib.sha1(str(root).encode("utf-8")).hexdigest()[:12]
+
+
+def _manifest_path(persist_dir: str, chroma_collection_name: str, root: Path) -> Path:
+    # One manifest per (collection, source folder) so ingesting a second folder
+    # into the same collection doesn't look like the first one was deleted.
+    return Path(persist_dir) / f"{chroma_collection_name}-{_root_key(root)}.manifest.json"
+
+
+def _document_key(root: Path, file_path: Path) -> str:
+    # Qualified by the ingested folder: several folders can share a collection, talk
+    # filenames repeat across conferences (gc_2025_apr/01_oaks.txt vs gc_2025_oct/...)
+    # and two folders may even share a name (a/gc_2025_oct vs b/gc_2025_oct)
+    return f"{root.name}-{_root_key(root)}/{file_path.relative_to(root).as_posix()}"
+
+
+def load_manifest(path: Path, settings: dict[str, Any]) -> dict[str, dict[str, Any]]:
+    """
+    Per-file ingest state: {document key: {"sha256", "size", "mtime_ns", "chunk_ids"}}.
+    A manifest written with different embedding/splitting settings is discarded,
+    which forces every file to be re-embedded.
+    """
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if data.get("settings") != settings:
+        return {}
+    return data.get("files", {})
+
+
+def save_manifest(path: Path, settings: dict[str, Any], files: dict[str, dict[str, Any]]) -> None:
+    # Write-then-rename so an interrupted run never leaves a truncated manifest
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps({"settings": settings, "files": files}), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+ChunkRecord = tuple[str, str, dict[str, Any]]  # (chunk id, document, metadata)
+
+
+def _prepare_file(
+        collection,
+        splitter: RecursiveCharacterTextSplitter,
+        root: Path,
+        file_path: Path,
+        entry: dict[str, Any] | None,
+        untracked_chunks: bool,
+) -> tuple[dict[str, Any] | None, list[ChunkRecord]]:
+    """
+    Decide what to do with one file given its previous manifest entry.
+    Returns (new manifest entry, chunks to embed); the entry is None when the file
+    is untouched. Stale chunks of a changed file are deleted here.
+    """
+    doc_key = _document_key(root, file_path)
+    stat = file_path.stat()
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return None, []
+
+    data = file_path.read_bytes()
+    digest = hashlib.sha256(data).hexdigest()
+    if entry and entry["sha256"] == digest:
+        # Touched but not changed: just refresh the stat fingerprint
+        return {**entry, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}, []
+
+    if entry:
+        if entry["chunk_ids"]:
+            collection.delete(ids=entry["chunk_ids"])
+    elif untracked_chunks:
+        # Ingested before the manifest existed (or with other settings). Older runs keyed
+        # chunks by the path inside the folder only, so match those by containing folder too.
+        collection.delete(where={"rel_path": doc_key})
+        collection.delete(where={"$and": [
+            {"rel_path": str(file_path.relative_to(root))},
+            {"collection_id": file_path.parent.name},
+        ]})
+
+    text = decode_text(data)
+    collection_id = file_path.parent.name  # containing folder name
+    chunks = splitter.split_text(text) if text.strip() else []
+
+    records: list[ChunkRecord] = []
+    for i, chunk in enumerate(chunks):
+        chunk_id = f"{doc_key}::chunk_{i}"  # unique per folder+file+chunk
+        records.append((
+            chunk_id,
+            chunk,
+            {
+                "filename": file_path.name,
+                "chunk_index": i,
+                "collection_id": collection_id,
+                "rel_path": doc_key,  # the document key used when stitching
+            },
+        ))
+
+    new_entry = {
+        "sha256": digest,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "chunk_ids": [chunk_id for chunk_id, _, _ in records],
+    }
+    return new_entry, records
+
+
+def _is_unchanged(entry: dict[str, Any] | None, new_entry: dict[str, Any] | None) -> bool:
+    return new_entry is None or (entry is not None and entry["sha256"] == new_entry["sha256"])
+
+
+def _ingest_serial(
+        collection,
+        splitter: RecursiveCharacterTextSplitter,
+        root: Path,
+        manifest: dict[str, dict[str, Any]],
+        untracked_chunks: bool,
+        commit,  # called with finished manifest entries after each add
+        batch_size: int,
+        embed_documents: Callable[[list[str]], list],
+) -> tuple[int, int, set[str]]:
+    ids: list[str] = []
+    docs: list[str] = []
+    metas: list[dict[str, Any]] = []
+    pending: dict[str, dict[str, Any]] = {}  # manifest entries waiting on the next add
+
+    added = 0
+    skipped = 0
+    seen: set[str] = set()
+
+    def flush():
+        nonlocal ids, docs, metas, added
+        if ids:
+            collection.upsert(ids=ids, documents=docs, metadatas=metas, embeddings=embed_documents(docs))
+            added += len(ids)
+        commit(pending)
+        pending.clear()
+        ids, docs, metas = [], [], []
+
+    for file_path in iter_files(root):
+        doc_key = _document_key(root, file_path)
+        seen.add(doc_key)
+
+        entry = manifest.get(doc_key)
+        new_entry, records = _prepare_file(collection, splitter, root, file_path, entry, untracked_chunks)
+        if _is_unchanged(entry, new_entry):
+            skipped += 1
+        if new_entry is not None:
+            pending[doc_key] = new_entry
+
+        for chunk_id, doc, meta in records:
+            ids.append(chunk_id)
+            docs.append(doc)
+            metas.append(meta)
+
+        if len(ids) >= batch_size:
+            flush()
+
+    flush()
+    return added, skipped, seen
+
+
+async def _ingest_pipelined(
+        collection,
+        splitter: RecursiveCharacterTextSplitter,
+        root: Path,
+        manifest: dict[str, dict[str, Any]],
+        untracked_chunks: bool,
+        commit,  # called with finished manifest entries after each add
+        batch_size: int,
+        openai_model: str,
+        concurrency: int,
+        queue_size: int,
+        cache: EmbeddingCache | None,
+) -> tuple[int, int, set[str]]:
+    """
+    reader/splitter -> bounded queue -> `concurrency` embedding requests -> single writer.
+    Only `queue_size` batches wait for embedding and `concurrency` wait for the writer,
+    so memory is bounded by the queues rather than by the corpus.
+    """
+    ai = AsyncOpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+    to_embed: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+    to_write: asyncio.Queue = asyncio.Queue(maxsize=concurrency)
+
+    remaining: dict[str, int] = {}  # document key -> chunks not yet written
+    waiting: dict[str, dict[str, Any]] = {}  # manifest entries of files with chunks in flight
+    added = 0
+    skipped = 0
+    seen: set[str] = set()
+
+    async def read_files():
+        nonlocal skipped
+        batch: list[ChunkRecord] = []
+        for file_path in iter_files(root):
+            doc_key = _document_key(root, file_path)
+            seen.add(doc_key)
+
+            entry = manifest.get(doc_key)
+            new_entry, records = await asyncio.to_thread(
+                _prepare_file, collection, splitter, root, file_path, entry, untracked_chunks
+            )
+            if _is_unchanged(entry, new_entry):
+                skipped += 1
+            if new_entry is None:
+                continue
+            if not records:
+                commit({doc_key: new_entry})
+                continue
+
+            remaining[doc_key] = len(records)
+            waiting[doc_key] = new_entry
+            for record in records:
+                batch.append(record)
+                if len(batch) >= batch_size:
+                    await to_embed.put(batch)
+                    batch = []
+
+        if batch:
+            await to_embed.put(batch)
+        for _ in range(concurrency):
+            await to_embed.put(None)
+
+    async def embed(texts: list[str]) -> list:
+        response = await ai.embeddings.create(model=openai_model, input=texts)
+        return [d.embedding for d in response.data]
+
+    async def embed_batches():
+        while (batch := await to_embed.get()) is not None:
+            texts = [doc for _, doc, _ in batch]
+            if cache is not None:
+                embeddings = await cache.aembed(openai_model, texts, embed)
+            else:
+                embeddings = await embed(texts)
+            await to_write.put((batch, embeddings))
+        await to_write.put(None)
+
+    async def write_batches():
+        nonlocal added
+        done_workers = 0
+        while done_workers < concurrency:
+            item = await to_write.get()
+            if item is None:
+                done_workers += 1
+                continue
+            batch, embeddings = item
+            await asyncio.to_thread(
+                collection.upsert,
+                ids=[chunk_id for chunk_id, _, _ in batch],
+                documents=[doc for _, doc, _ in batch],
+                metadatas=[meta for _, _, meta in batch],
+                embeddings=embeddings,
+            )
+            added += len(batch)
+
+            finished = {}
+            for _, _, meta in batch:
+                doc_key = meta["rel_path"]
+                remaining[doc_key] -= 1
+                if not remaining[doc_key]:
+                    del remaining[doc_key]
+                    finished[doc_key] = waiting.pop(doc_key)
+            commit(finished)
+
+    async with ai:
+        async with asyncio.TaskGroup() as tasks:
+            tasks.create_task(read_files())
+            for _ in range(concurrency):
+                tasks.create_task(embed_batches())
+            tasks.create_task(write_batches())
+
+    return added, skipped, seen
+
+
+def _open_collection(persist_dir: str, chroma_collection_name: str, openai_model: str):
+    # Persistent DB
+    client = chromadb.PersistentClient(path=persist_dir)
+
+    # OpenAI embeddings (uses OPENAI_API_KEY env var by default)
+    load_dotenv()
+    openai_ef = OpenAIEmbeddingFunction(
+        model_name=openai_model,
+        api_key=os.getenv('OPENAI_API_KEY')
+    )
+
+    collection = client.get_or_create_collection(
+        name=chroma_collection_name,
+        embedding_function=openai_ef,
+    )
+    return collection, openai_ef
+
+
+def _document_embedder(openai_ef, openai_model: str, cache: EmbeddingCache | None) -> Callable[[list[str]], list]:
+    def embed_documents(docs: list[str]) -> list:
+        if cache is None:
+            return openai_ef(docs)
+        return cache.embed(openai_model, docs, openai_ef)
+    return embed_documents
 
 
 def ingest_folder(
@@ -40,26 +360,152 @@ def ingest_folder(
         chunk_size: int = 1200,
         chunk_overlap: int = 150,
         batch_size: int = 256,
+        pipelined: bool = False,  # overlap reading, embedding and writing
+        concurrency: int = 4,  # embedding requests in flight (pipelined only)
+        queue_size: int = 8,  # batches buffered ahead of the embedders (pipelined only)
+        use_cache: bool = True,  # reuse embeddings from the shared on-disk cache
 ) -> None:
     root = Path(folder).expanduser().resolve()
     if not root.is_dir():
         raise SystemExit(f"Not a directory: {root}")
 
-    # Persistent DB
-    client = chromadb.PersistentClient(path=persist_dir)
+    collection, openai_ef = _open_collection(persist_dir, chroma_collection_name, openai_model)
 
-    # OpenAI embeddings (uses OPENAI_API_KEY env var by default)
-    load_dotenv()
-    openai_ef = OpenAIEmbeddingFunction(
-        model_name=openai_model,
-        api_key=os.getenv('OPENAI_API_KEY')
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        is_separator_regex=False,
     )
 
-    collection = client.get_or_create_collection(
-        name=chroma_collection_name,
-        embedding_function=openai_ef,
+    settings = {
+        "openai_model": openai_model,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+        "document_key": "folder-id/path",  # manifests from before folder-qualified keys are rebuilt
+    }
+    manifest_path = _manifest_path(persist_dir, chroma_collection_name, root)
+    manifest = load_manifest(manifest_path, settings)
+    untracked_chunks = not manifest and collection.count() > 0
+    committed = dict(manifest)
+
+    def commit(entries: dict[str, dict[str, Any]]) -> None:
+        # Only entries whose chunks are already in the DB are persisted
+        committed.update(entries)
+        save_manifest(manifest_path, settings, committed)
+
+    cache = get_embedding_cache() if use_cache else None
+    embed_documents = _document_embedder(openai_ef, openai_model, cache)
+
+    start = time.perf_counter()
+    if pipelined:
+        added, skipped, seen = asyncio.run(_ingest_pipelined(
+            collection, splitter, root, manifest, untracked_chunks, commit,
+            batch_size, openai_model, concurrency, queue_size, cache,
+        ))
+    else:
+        added, skipped, seen = _ingest_serial(
+            collection, splitter, root, manifest, untracked_chunks, commit,
+            batch_size, embed_documents,
+        )
+
+    removed = [doc_key for doc_key in manifest if doc_key not in seen]
+    for doc_key in removed:
+        if chunk_ids := committed.pop(doc_key)["chunk_ids"]:
+            collection.delete(ids=chunk_ids)
+    commit({})
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Ingested {added} chunks into '{chroma_collection_name}' (persisted at '{persist_dir}'); "
+        f"{skipped} files unchanged, {len(removed)} removed."
     )
+    if added:
+        print(f"{elapsed:.1f}s, {added / elapsed:.1f} chunks/sec")
+
+
+def iter_corpus_records(path: Path) -> Iterable[dict[str, Any]]:
+    """
+    Talk records from a download_gc_talks --jsonl corpus (.jsonl or .jsonl.gz).
+    A truncated or corrupt gzip stream ends the corpus at the last readable record.
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    with opener(path, "rt", encoding="utf-8") as corpus:
+        try:
+            for line in corpus:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted crawl
+        except (EOFError, gzip.BadGzipFile, zlib.error) as exc:
+            print(f"Warning: {path} is truncated or corrupt, stopping there ({exc!r})")
+
+
+def _paragraph_chunks(
+        record: dict[str, Any],
+        splitter: RecursiveCharacterTextSplitter,
+        chunk_size: int,
+) -> list[tuple[str, int, int]]:
+    """
+    Pack whole paragraphs into chunks of up to chunk_size characters; only a
+    paragraph longer than that is split. Returns (text, first paragraph, last paragraph).
+    The speaker/title header leads the first chunk, like the first lines of the .txt files.
+    """
+    speaker = record.get("speaker") or "unknown_speaker"
+    role = record.get("role") or ""
+    header = f"{speaker} ({role})" if role else speaker
+    units = [(0, header), (0, record.get("title") or "Untitled Talk")]
+    units += list(enumerate(record.get("paragraphs", [])))
+
+    chunks: list[tuple[str, int, int]] = []
+    texts: list[str] = []
+    first = 0
+
+    def flush():
+        nonlocal texts
+        if texts:
+            chunks.append(("\n".join(texts) + "\n", first, last))
+            texts = []
+
+    last = 0
+    for i, text in units:
+        if len(text) > chunk_size:
+            flush()
+            chunks.extend((piece + "\n", i, i) for piece in splitter.split_text(text))
+            continue
+        if texts and sum(map(len, texts)) + len(texts) + len(text) > chunk_size:
+            flush()
+        if not texts:
+            first = i
+        texts.append(text)
+        last = i
+    flush()
+    return chunks
+
 
+def ingest_jsonl(
+        persist_dir: str,  # path to chromaDB dir
+        chroma_collection_name: str,  # which collection to ingest to
+        corpus: str,  # download_gc_talks --jsonl output
+        openai_model: str = "text-embedding-3-small",
+        chunk_size: int = 1200,
+        chunk_overlap: int = 150,  # only used when a single paragraph must be split
+        batch_size: int = 256,
+        use_cache: bool = True,  # reuse embeddings from the shared on-disk cache
+) -> None:
+    """
+    Ingest a JSONL talk corpus with paragraph-aware chunks and talk metadata
+    (url, conference, speaker, role, title, paragraph range). Talks are keyed by
+    URL: when a URL appears more than once the last record wins, and only
+    records whose content changed since the previous run are re-embedded.
+    """
+    path = Path(corpus).expanduser().resolve()
+    if not path.is_file():
+        raise SystemExit(f"Not a file: {path}")
+
+    collection, openai_ef = _open_collection(persist_dir, chroma_collection_name, openai_model)
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=chunk_size,
         chunk_overlap=chunk_overlap,
@@ -67,62 +513,227 @@ def ingest_folder(
         is_separator_regex=False,
     )
 
+    settings = {
+        "format": "jsonl",
+        "openai_model": openai_model,
+        "chunk_size": chunk_size,
+        "chunk_overlap": chunk_overlap,
+    }
+    manifest_path = _manifest_path(persist_dir, chroma_collection_name, path)
+    manifest = load_manifest(manifest_path, settings)
+    untracked_chunks = not manifest and collection.count() > 0
+    committed = dict(manifest)
+    embed_documents = _document_embedder(
+        openai_ef, openai_model, get_embedding_cache() if use_cache else None
+    )
+
+    # Pass 1: which line holds the latest version of each talk
+    latest: dict[str, tuple[int, str]] = {}
+    for line_no, record in enumerate(iter_corpus_records(path)):
+        digest = hashlib.sha256(json.dumps(record, sort_keys=True).encode("utf-8")).hexdigest()
+        latest[record["url"]] = (line_no, digest)
+
     ids: list[str] = []
     docs: list[str] = []
     metas: list[dict[str, Any]] = []
-
+    pending: dict[str, dict[str, Any]] = {}
     added = 0
+    skipped = 0
 
-    for file_path in iter_files(root):
-        text = read_text(file_path)
-        if not text.strip():
+    def flush():
+        nonlocal ids, docs, metas, added
+        if ids:
+            collection.upsert(ids=ids, documents=docs, metadatas=metas, embeddings=embed_documents(docs))
+            added += len(ids)
+        committed.update(pending)
+        pending.clear()
+        save_manifest(manifest_path, settings, committed)
+        ids, docs, metas = [], [], []
+
+    # Pass 2: embed new and changed talks
+    start = time.perf_counter()
+    for line_no, record in enumerate(iter_corpus_records(path)):
+        url = record["url"]
+        latest_line, digest = latest[url]
+        if line_no != latest_line:
             continue
 
-        rel_path = str(file_path.relative_to(root))
-        collection_id = file_path.parent.name  # containing folder name
-
-        chunks = splitter.split_text(text)
-
-        for i, chunk in enumerate(chunks):
-            chunk_id = f"{rel_path}::chunk_{i}"  # unique per file+chunk
+        entry = manifest.get(url)
+        if entry and entry["sha256"] == digest:
+            skipped += 1
+            continue
+        if entry:
+            if entry["chunk_ids"]:
+                collection.delete(ids=entry["chunk_ids"])
+        elif untracked_chunks:
+            collection.delete(where={"rel_path": url})
+
+        chunk_ids = []
+        for i, (text, first, last) in enumerate(_paragraph_chunks(record, splitter, chunk_size)):
+            chunk_id = f"{url}::chunk_{i}"
+            chunk_ids.append(chunk_id)
             ids.append(chunk_id)
-            docs.append(chunk)
+            docs.append(text)
             metas.append(
                 {
-                    "filename": file_path.name,
+                    "filename": urlparse(url).path.rsplit("/", 1)[-1],
                     "chunk_index": i,
-                    "collection_id": collection_id,
-                    "rel_path": rel_path,
+                    "collection_id": record.get("conference", ""),
+                    "rel_path": url,  # the document key used when stitching
+                    "url": url,
+                    "conference": record.get("conference", ""),
+                    "speaker": record.get("speaker", ""),
+                    "role": record.get("role", ""),
+                    "title": record.get("title", ""),
+                    "paragraph_start": first,
+                    "paragraph_end": last,
                 }
             )
+        pending[url] = {"sha256": digest, "chunk_ids": chunk_ids}
 
         if len(ids) >= batch_size:
-            collection.add(ids=ids, documents=docs, metadatas=metas)
-            added += len(ids)
-            ids, docs, metas = [], [], []
+            flush()
+
+    removed = [url for url in manifest if url not in latest]
+    for url in removed:
+        if chunk_ids := committed.pop(url)["chunk_ids"]:
+            collection.delete(ids=chunk_ids)
+    flush()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Ingested {added} chunks into '{chroma_collection_name}' (persisted at '{persist_dir}'); "
+        f"{skipped} talks unchanged, {len(removed)} removed."
+    )
+    if added:
+        print(f"{elapsed:.1f}s, {added / elapsed:.1f} chunks/sec")
+
+
+# (rel_path, collection_id) of a stitched document. rel_path is folder-qualified
+# since folders can share a collection; collection_id keeps chunks ingested before
+# that (plain filenames) from merging talks across conferences.
+DocumentKey = tuple[str, str]
+
+
+def _document_key_of(meta: dict[str, Any]) -> DocumentKey:
+    return meta["rel_path"], meta.get("collection_id", "")
+
+
+class DocumentLRU:
+    """Stitched documents keyed by (collection name, rel_path, collection_id)."""
+
+    def __init__(self, max_entries: int = 128):
+        self.max_entries = max_entries
+        self._docs: OrderedDict[tuple[str, str, str], str] = OrderedDict()
+
+    def get(self, key: tuple[str, str, str]) -> str | None:
+        doc = self._docs.get(key)
+        if doc is not None:
+            self._docs.move_to_end(key)
+        return doc
 
-    if ids:
-        collection.add(ids=ids, documents=docs, metadatas=metas)
-        added += len(ids)
+    def put(self, key: tuple[str, str, str], doc: str) -> None:
+        self._docs[key] = doc
+        self._docs.move_to_end(key)
+        while len(self._docs) > self.max_entries:
+            self._docs.popitem(last=False)
 
-    print(f"Ingested {added} chunks into '{chroma_collection_name}' (persisted at '{persist_dir}').")
+    def clear(self) -> None:
+        self._docs.clear()
 
 
 def _get_whole_documents(
         collection,
-        filenames: list[str]
+        keys: list[DocumentKey],
+        doc_cache: DocumentLRU | None = None,
 ) -> list[str]:
-    whole_docs = []
-    for filename in set(filenames):
+    keys = list(dict.fromkeys(keys))  # dedupe, keep rank order
+
+    stitched: dict[DocumentKey, str] = {}
+    if doc_cache is not None:
+        for key in keys:
+            if (doc := doc_cache.get((collection.name, *key))) is not None:
+                stitched[key] = doc
+
+    if missing := [key for key in keys if key not in stitched]:
         got = collection.get(
-            where={"filename": filename},
+            where={"rel_path": {"$in": list({rel_path for rel_path, _ in missing})}},
             include=["documents", "metadatas"],
         )
-        pairs = list(zip(got["documents"], got["metadatas"]))
-        pairs.sort(key=lambda x: x[1]["chunk_index"])
-        full_text = "".join(t for t, _ in pairs)
-        whole_docs.append(full_text)
-    return whole_docs
+        chunks: dict[DocumentKey, dict[int, str]] = {key: {} for key in missing}
+        for text, meta in zip(got["documents"], got["metadatas"]):
+            # Same rel_path in another folder (old plain-filename chunks) is a different talk
+            if (by_index := chunks.get(_document_key_of(meta))) is not None:
+                by_index[meta["chunk_index"]] = text
+        for key, by_index in chunks.items():
+            stitched[key] = "".join(by_index[i] for i in sorted(by_index))
+            if doc_cache is not None:
+                doc_cache.put((collection.name, *key), stitched[key])
+
+    return [stitched[key] for key in keys]
+
+
+class WholeDocumentRetriever:
+    """
+    Long-lived handle for querying a collection: the Chroma client, collection,
+    embedding function (and its pooled HTTP client) are created once and reused,
+    so each query only pays for the query embedding and the ANN search.
+    """
+
+    def __init__(
+            self,
+            chroma_dir: str,
+            collection: str,
+            openai_model: str = "text-embedding-3-small",
+            use_cache: bool = True,
+            doc_cache_size: int = 128,
+    ):
+        load_dotenv()
+        self.openai_model = openai_model
+        self.client = chromadb.PersistentClient(path=chroma_dir)
+        self.embedding_function = OpenAIEmbeddingFunction(
+            model_name=openai_model,
+            api_key=os.getenv('OPENAI_API_KEY')
+        )
+        self.collection = self.client.get_collection(
+            name=collection,
+            embedding_function=self.embedding_function,
+        )
+        self.embedding_cache = get_embedding_cache() if use_cache else None
+        self.doc_cache = DocumentLRU(doc_cache_size) if doc_cache_size else None
+
+    def embed_query(self, query: str) -> list:
+        if self.embedding_cache is None:
+            return self.embedding_function([query])
+        return self.embedding_cache.embed(self.openai_model, [query], self.embedding_function)
+
+    def warm_up(self) -> None:
+        # Open the HTTPS connection to the embeddings API and load the vector index
+        embedding = self.embedding_function(["warm up"])
+        if self.collection.count():
+            self.collection.query(query_embeddings=embedding, n_results=1, include=[])
+
+    def query(self, query: str, n_results: int = 5) -> list[str]:
+        # 1) Find best matching chunk
+        q = self.collection.query(
+            query_embeddings=self.embed_query(query),
+            n_results=n_results,
+            include=["metadatas"],
+        )
+
+        # 2) Fetch and stitch all chunks of the matched documents in one round trip
+        keys = [_document_key_of(meta) for meta in q['metadatas'][0]]
+        return _get_whole_documents(self.collection, keys, self.doc_cache)
+
+
+@cache
+def get_retriever(
+        chroma_dir: str,
+        collection: str,
+        openai_model: str = "text-embedding-3-small",
+        use_cache: bool = True,
+) -> WholeDocumentRetriever:
+    return WholeDocumentRetriever(chroma_dir, collection, openai_model, use_cache)
 
 
 def query_whole_documents(
@@ -131,32 +742,10 @@ def query_whole_documents(
         query: str,
         n_results: int = 5,
         openai_model: str = "text-embedding-3-small",
+        use_cache: bool = True,
 ) -> list[str]:
-    client = chromadb.PersistentClient(path=chroma_dir)
-
-    load_dotenv()
-    openai_ef = OpenAIEmbeddingFunction(
-        model_name=openai_model,
-        api_key=os.getenv('OPENAI_API_KEY')
-    )
-
-    collection = client.get_collection(
-        name=collection,
-        embedding_function=openai_ef,
-    )
-
-    # 1) Find best matching chunk
-    q = collection.query(
-        query_texts=[query],
-        n_results=n_results,
-        include=["metadatas"],
-    )
-
-    # 2) Fetch and stitch all chunks for that doc_id
-    filenames = [meta['filename'] for meta in q['metadatas'][0]]
-    docs = _get_whole_documents(collection, filenames)
-
-    return docs
+    retriever = get_retriever(chroma_dir, collection, openai_model, use_cache)
+    return retriever.query(query, n_results)
 
 
 @wraps(query_whole_documents)
@@ -171,5 +760,6 @@ if __name__ == "__main__":
 
     fire.Fire({
         'ingest': ingest_folder,
+        'ingest_jsonl': ingest_jsonl,
         'query': _cli_query
     })
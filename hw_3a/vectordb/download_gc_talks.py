@@ -3,20 +3,33 @@
 
 Usage:
     python download_gc_talks.py <conference_url> <output_dir>
+    python download_gc_talks.py backfill <start YYYY-MM> <end YYYY-MM> <output_dir>
 """
 
 import argparse
 import base64
+import binascii
+import gzip
 import json
+import logging
+import os
 import re
+import shutil
 import sys
+import threading
 import time
 import unicodedata
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from html.parser import HTMLParser
 from pathlib import Path
 from typing import Dict, Iterable, List, Optional, Tuple
 from urllib.parse import parse_qsl, urlencode, urljoin, urlparse, urlunparse
-from urllib.request import Request, urlopen
+
+# Adds the above directory to the syspath for shared package
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from shared.http_cache import HttpCache
+from shared.http_client import DEFAULT_RETRIES, PooledClient
 
 USER_AGENT = (
     "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
@@ -35,15 +48,67 @@ def normalize_url_with_lang(url: str, lang: str = "eng") -> str:
     return urlunparse(parsed._replace(query=urlencode(query)))
 
 
+# Set from the command line in main(); None disables caching
+http_cache: Optional[HttpCache] = None
+# Keep-alive connection pool shared by the fetch threads; sized from the command line in main()
+http_client: Optional[PooledClient] = None
+
+
+def get_client() -> PooledClient:
+    global http_client
+    if http_client is None:
+        http_client = PooledClient(headers={"User-Agent": USER_AGENT})
+    return http_client
+
+
 def fetch_html(url: str, timeout: int = 25) -> str:
-    req = Request(url, headers={"User-Agent": USER_AGENT})
-    with urlopen(req, timeout=timeout) as response:
-        charset = response.headers.get_content_charset() or "utf-8"
-        return response.read().decode(charset, errors="replace")
+    if http_cache is None:
+        response = get_client().get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.text
+
+    def send(extra_headers: Dict[str, str]):
+        response = get_client().get(url, headers=extra_headers, timeout=timeout)
+        if response.is_error:  # a 304 goes back to the cache
+            response.raise_for_status()
+        return response.status_code, response.headers, response.content
+
+    return http_cache.fetch(url, send).text()
+
+
+class HostRateLimiter:
+    """Token bucket per host: `rate` requests per second on average, bursts of up to `burst`."""
+
+    def __init__(self, rate: Optional[float], burst: int = 1) -> None:
+        self.rate = rate
+        self.burst = max(1, burst)
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # host -> (tokens, last refill)
+
+    def acquire(self, url: str) -> None:
+        if not self.rate:
+            return
+        host = urlparse(url).netloc
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                tokens, last = self._buckets.get(host, (float(self.burst), now))
+                tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+                if tokens >= 1:
+                    self._buckets[host] = (tokens - 1, now)
+                    return
+                self._buckets[host] = (tokens, now)
+                wait = (1 - tokens) / self.rate
+            time.sleep(wait)
+
+
+INITIAL_STATE_RE = re.compile(r'window\.__INITIAL_STATE__="([^"]+)";')
+JSON_WS_RE = re.compile(r"[ \t\n\r]*")
+JSON_DECODER = json.JSONDecoder()
 
 
 def extract_initial_state(html: str) -> Dict:
-    match = re.search(r'window\.__INITIAL_STATE__="([^"]+)";', html)
+    match = INITIAL_STATE_RE.search(html)
     if not match:
         return {}
     try:
@@ -53,6 +118,41 @@ def extract_initial_state(html: str) -> Dict:
         return {}
 
 
+def decode_initial_state(html: str) -> str:
+    """The decoded __INITIAL_STATE__ JSON text, without parsing it."""
+    match = INITIAL_STATE_RE.search(html)
+    if not match:
+        return ""
+    # a2b_base64 takes the ASCII str directly, skipping b64decode's bytes copy
+    return binascii.a2b_base64(match.group(1)).decode("utf-8", errors="replace")
+
+
+def iter_json_object_items(text: str, pos: int) -> Iterable[Tuple[str, object]]:
+    """
+    Yield (key, value) pairs of the JSON object starting at text[pos] one at a
+    time, so a caller that stops early never parses the remaining values.
+    """
+    if text[pos:pos + 1] != "{":
+        raise ValueError(f"Expected '{{' at {pos}")
+    pos = JSON_WS_RE.match(text, pos + 1).end()
+    if text[pos:pos + 1] == "}":
+        return
+    while True:
+        key, pos = JSON_DECODER.raw_decode(text, pos)
+        pos = JSON_WS_RE.match(text, pos).end()
+        if text[pos:pos + 1] != ":":
+            raise ValueError(f"Expected ':' at {pos}")
+        pos = JSON_WS_RE.match(text, pos + 1).end()
+        value, pos = JSON_DECODER.raw_decode(text, pos)
+        yield key, value
+        pos = JSON_WS_RE.match(text, pos).end()
+        if text[pos:pos + 1] == "}":
+            return
+        if text[pos:pos + 1] != ",":
+            raise ValueError(f"Expected ',' or '}}' at {pos}")
+        pos = JSON_WS_RE.match(text, pos + 1).end()
+
+
 def sanitize_speaker_name(name: str) -> str:
     name = collapse_whitespace(name)
     name = re.sub(r"^by\s+", "", name, flags=re.IGNORECASE)
@@ -192,17 +292,13 @@ class BodyParser(HTMLParser):
                 self._byline_depth -= 1
 
 
-def extract_talk_from_state(talk_state: Dict, talk_url: str) -> Tuple[str, str, str, List[str]]:
-    reader = talk_state.get("reader", {})
-    content_store = reader.get("contentStore", {})
-    if not isinstance(content_store, dict) or not content_store:
-        return "", "", "", []
-
+def choose_content_entry(entries: Iterable[object], talk_url: str) -> Optional[Dict]:
+    """The contentStore entry for talk_url, else the first entry; stops consuming on a match."""
     parsed = urlparse(talk_url)
     expected_uri = parsed.path
 
     chosen_entry: Optional[Dict] = None
-    for entry in content_store.values():
+    for entry in entries:
         if not isinstance(entry, dict):
             continue
         uri = entry.get("uri", "")
@@ -211,7 +307,43 @@ def extract_talk_from_state(talk_state: Dict, talk_url: str) -> Tuple[str, str,
             break
         if chosen_entry is None:
             chosen_entry = entry
+    return chosen_entry
+
+
+def extract_talk_from_html(talk_html: str, talk_url: str) -> Tuple[str, str, str, List[str]]:
+    """
+    Same result as extract_talk_from_state(extract_initial_state(html), url), but
+    only parses contentStore entries up to the one for talk_url instead of the
+    whole reader state. The first "contentStore" key found is not necessarily
+    reader.contentStore, so the scan only counts when it finds talk_url's entry.
+    """
+    try:
+        payload = decode_initial_state(talk_html)
+    except ValueError:  # binascii.Error on a malformed blob
+        payload = ""
+    key_pos = payload.find('"contentStore":')
+    if key_pos != -1:
+        try:
+            store_pos = JSON_WS_RE.match(payload, key_pos + len('"contentStore":')).end()
+            entries = (value for _, value in iter_json_object_items(payload, store_pos))
+            entry = choose_content_entry(entries, talk_url)
+            if entry is not None and entry.get("uri") == urlparse(talk_url).path:
+                return extract_talk_from_entry(entry)
+        except ValueError:  # json.JSONDecodeError is a ValueError
+            pass
+    # Unexpected layout or no entry for talk_url: parse everything
+    return extract_talk_from_state(extract_initial_state(talk_html), talk_url)
+
+
+def extract_talk_from_state(talk_state: Dict, talk_url: str) -> Tuple[str, str, str, List[str]]:
+    reader = talk_state.get("reader", {})
+    content_store = reader.get("contentStore", {})
+    if not isinstance(content_store, dict) or not content_store:
+        return "", "", "", []
+    return extract_talk_from_entry(choose_content_entry(content_store.values(), talk_url))
+
 
+def extract_talk_from_entry(chosen_entry: Optional[Dict]) -> Tuple[str, str, str, List[str]]:
     if not chosen_entry:
         return "", "", "", []
 
@@ -256,6 +388,62 @@ def extract_talk_from_state(talk_state: Dict, talk_url: str) -> Tuple[str, str,
     return title, speaker, role, paragraphs
 
 
+def fetch_page(url: str, limiter: HostRateLimiter) -> str:
+    limiter.acquire(url)
+    return fetch_html(url)
+
+
+def fetch_talk(talk_url: str, limiter: HostRateLimiter) -> Tuple[str, str, str, List[str]]:
+    return extract_talk_from_html(fetch_page(talk_url, limiter), talk_url)
+
+
+class TalkFetcher:
+    """
+    Fetch stage on a thread pool; with parse_workers > 0 a separate parse stage
+    runs extract_talk_from_html in worker processes so CPU-bound HTML parsing
+    never holds up network I/O. Each page's HTML is sent to a worker once.
+    """
+
+    def __init__(self, limiter: HostRateLimiter, max_in_flight: int, parse_workers: int = 0) -> None:
+        self.limiter = limiter
+        self._fetch_pool = ThreadPoolExecutor(max_workers=max(1, max_in_flight))
+        self._parse_pool = ProcessPoolExecutor(max_workers=parse_workers) if parse_workers > 0 else None
+
+    def submit(self, talk_url: str) -> Future:
+        """Future of (title, speaker, role, paragraphs) for one talk."""
+        if self._parse_pool is None:
+            return self._fetch_pool.submit(fetch_talk, talk_url, self.limiter)
+
+        result: Future = Future()
+
+        def parsed(parse_future: Future) -> None:
+            try:
+                result.set_result(parse_future.result())
+            except BaseException as exc:  # noqa: BLE001
+                result.set_exception(exc)
+
+        def fetched(fetch_future: Future) -> None:
+            try:
+                talk_html = fetch_future.result()
+                parse_future = self._parse_pool.submit(extract_talk_from_html, talk_html, talk_url)
+            except BaseException as exc:  # noqa: BLE001
+                result.set_exception(exc)
+                return
+            parse_future.add_done_callback(parsed)
+
+        self._fetch_pool.submit(fetch_page, talk_url, self.limiter).add_done_callback(fetched)
+        return result
+
+    def __enter__(self) -> "TalkFetcher":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        # Fetches finish first; they are the only source of parse jobs
+        self._fetch_pool.shutdown()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+
+
 def slugify_name(text: str) -> str:
     text = sanitize_speaker_name(text)
     text = unicodedata.normalize("NFKD", text)
@@ -284,37 +472,437 @@ def write_talk_file(path: Path, speaker: str, role: str, title: str, paragraphs:
     path.write_text("\n".join(lines).rstrip() + "\n", encoding="utf-8")
 
 
-def parse_args() -> argparse.Namespace:
-    parser = argparse.ArgumentParser(description="Download General Conference talks to text files.")
-    parser.add_argument("conference_url", help="Conference page URL to crawl")
-    parser.add_argument("output_dir", help="Directory where .txt files will be written")
+def conference_id_from_url(url: str) -> str:
+    """'.../general-conference/2025/10?lang=eng' -> '2025-10'; other URLs are returned as their path."""
+    path = urlparse(url).path
+    match = re.search(r"/general-conference/(\d{4})/(\d{2})", path)
+    return f"{match.group(1)}-{match.group(2)}" if match else path
+
+
+def _ends_with_newline(path: Path) -> bool:
+    with path.open("rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+class TalkOutput:
+    """
+    Where finished talks go: the per-talk .txt files and/or one JSONL corpus
+    (gzip-compressed when the path ends in .gz) with a record per talk:
+    {"url", "conference", "speaker", "role", "title", "paragraphs"}.
+
+    A .gz corpus is never written to during the crawl: records go to a plain
+    "<path>.partial" file, which close() compresses into one new gzip member of
+    the corpus. A killed crawl leaves only the .partial file behind, and the
+    next run picks it up and appends to it.
+    """
+
+    def __init__(self, write_txt: bool = True, jsonl_path: Optional[Path] = None) -> None:
+        self.write_txt = write_txt
+        self.jsonl_path = jsonl_path
+        self._jsonl = None
+        self._staged_path: Optional[Path] = None
+        if jsonl_path is not None:
+            jsonl_path.parent.mkdir(parents=True, exist_ok=True)
+            path = jsonl_path
+            if jsonl_path.suffix == ".gz":
+                path = self._staged_path = jsonl_path.with_name(jsonl_path.name + ".partial")
+            self._jsonl = path.open("a", encoding="utf-8")
+            if self._jsonl.tell() and not _ends_with_newline(path):
+                self._jsonl.write("\n")  # end the torn record of a killed crawl
+
+    def write(
+            self,
+            output_dir: Path,
+            idx: int,
+            url: str,
+            conference: str,
+            speaker: str,
+            role: str,
+            title: str,
+            paragraphs: List[str],
+    ) -> Optional[Path]:
+        dest = None
+        if self.write_txt:
+            dest = output_dir / build_output_filename(idx, speaker)
+            write_talk_file(dest, speaker, role, title, paragraphs)
+        if self._jsonl is not None:
+            record = {
+                "url": url,
+                "conference": conference,
+                "speaker": speaker,
+                "role": role,
+                "title": title,
+                "paragraphs": paragraphs,
+            }
+            self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._jsonl.flush()
+        return dest
+
+    def close(self) -> None:
+        if self._jsonl is None:
+            return
+        self._jsonl.close()
+        self._jsonl = None
+        if self._staged_path is not None:
+            self._compress_staged()
+
+    def _compress_staged(self) -> None:
+        """Copy the corpus plus one gzip member of the staged records to a temp file, then swap it in."""
+        staged = self._staged_path
+        if staged.stat().st_size:
+            tmp = self.jsonl_path.with_name(self.jsonl_path.name + ".tmp")
+            with tmp.open("wb") as out:
+                if self.jsonl_path.exists():
+                    with self.jsonl_path.open("rb") as corpus:
+                        shutil.copyfileobj(corpus, out)
+                with staged.open("rb") as records, gzip.GzipFile(fileobj=out, mode="wb") as member:
+                    shutil.copyfileobj(records, member)
+            os.replace(tmp, self.jsonl_path)
+        staged.unlink()
+
+    def __enter__(self) -> "TalkOutput":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def write_talk_result(
+        idx: int,
+        item: Dict[str, str],
+        future,
+        output_dir: Path,
+        output: TalkOutput,
+        conference: str,
+) -> Tuple[str, Optional[Path]]:
+    """Write one fetched talk; returns ("written" | "skipped" | "failed", path written)."""
+    talk_url = item["url"]
+    default_title = item.get("title", "")
+    default_speaker = item.get("speaker", "")
+    try:
+        title, speaker, role, paragraphs = future.result()
+    except Exception as exc:  # noqa: BLE001
+        print(f"[{idx:02d}] Failed: {talk_url} ({exc})", file=sys.stderr)
+        return "failed", None
+
+    title = title or default_title or "Untitled Talk"
+    speaker = speaker or default_speaker or "unknown_speaker"
+    role = role or ""
+
+    if not paragraphs:
+        print(f"[{idx:02d}] Skipped (no paragraphs): {talk_url}", file=sys.stderr)
+        return "skipped", None
+
+    dest = output.write(output_dir, idx, talk_url, conference, speaker, role, title, paragraphs)
+    name = dest.name if dest else f"{title!r} to {output.jsonl_path}"
+    print(f"[{idx:02d}] Wrote {name} ({len(paragraphs)} paragraphs)")
+    return "written", dest
+
+
+def fetch_talk_items(conference_url: str, limiter: HostRateLimiter) -> List[Dict[str, str]]:
+    limiter.acquire(conference_url)
+    conference_html = fetch_html(conference_url)
+    conference_state = extract_initial_state(conference_html)
+    talk_items = extract_talk_items_from_state(conference_state, conference_url)
+    if not talk_items:
+        talk_items = extract_talk_items_from_html(conference_html, conference_url)
+    return talk_items
+
+
+def build_output(args: argparse.Namespace) -> TalkOutput:
+    return TalkOutput(write_txt=not args.no_txt, jsonl_path=Path(args.jsonl) if args.jsonl else None)
+
+
+def build_limiter(args: argparse.Namespace) -> HostRateLimiter:
+    rate = args.requests_per_second
+    if rate is None and args.delay_seconds > 0:
+        rate = 1 / args.delay_seconds
+    return HostRateLimiter(rate, args.burst)
+
+
+def parse_conference_id(text: str) -> Tuple[int, int]:
+    """'2025-10', '2025-oct' or '2025-october' -> (2025, 10)."""
+    match = re.fullmatch(r"(\d{4})[-_/]?(\d{1,2}|[a-z]+)", text.strip().lower())
+    if not match:
+        raise argparse.ArgumentTypeError(f"Expected YYYY-MM or YYYY-apr/oct, got {text!r}")
+    year, season = int(match.group(1)), match.group(2)
+    if season.isdigit():
+        month = int(season)
+    elif season.startswith("apr"):
+        month = 4
+    elif season.startswith("oct"):
+        month = 10
+    else:
+        month = 0
+    if month not in (4, 10):
+        raise argparse.ArgumentTypeError(f"General Conference is held in April (04) and October (10), got {text!r}")
+    return year, month
+
+
+def conference_range(start: Tuple[int, int], end: Tuple[int, int]) -> List[Tuple[int, int]]:
+    return [
+        (year, month)
+        for year in range(start[0], end[0] + 1)
+        for month in (4, 10)
+        if start <= (year, month) <= end
+    ]
+
+
+def conference_dir_name(year: int, month: int) -> str:
+    return f"gc_{year}_{'apr' if month == 4 else 'oct'}"
+
+
+class BackfillJournal:
+    """
+    Append-only JSONL log of backfill progress. Conference records keep the talk
+    listing so a resumed run needs no conference request; talk records keep the
+    latest status of each talk.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.conferences: Dict[str, List[Dict[str, str]]] = {}
+        self.talks: Dict[Tuple[str, str], Dict] = {}
+        if path.exists():
+            for line in path.read_text(encoding="utf-8").splitlines():
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # torn last line from an interrupted run
+                self._apply(record)
+
+    def _apply(self, record: Dict) -> None:
+        if record.get("type") == "conference":
+            self.conferences[record["conference"]] = record["talks"]
+        elif record.get("type") == "talk":
+            self.talks[(record["conference"], record["url"])] = record
+
+    def record(self, record: Dict) -> None:
+        self._apply(record)
+        with self.path.open("a", encoding="utf-8") as journal:
+            journal.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def is_done(self, conference: str, url: str, output_dir: Path) -> bool:
+        record = self.talks.get((conference, url))
+        if not record:
+            return False
+        if record["status"] == "skipped":
+            return True
+        # Talks written only to the JSONL corpus have no file to check
+        return record["status"] == "written" and (not record["file"] or (output_dir / record["file"]).exists())
+
+
+def backfill(args: argparse.Namespace) -> int:
+    output_dir = Path(args.output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    journal = BackfillJournal(output_dir / "backfill_journal.jsonl")
+    limiter = build_limiter(args)
+
+    conferences = conference_range(args.start, args.end)
+    if not conferences:
+        print("Empty conference range.", file=sys.stderr)
+        return 1
+
+    failures = 0
+    with TalkFetcher(limiter, args.max_in_flight, args.parse_workers) as fetcher, build_output(args) as output:
+        for year, month in conferences:
+            conference = f"{year}-{month:02d}"
+            conference_dir = output_dir / conference_dir_name(year, month)
+
+            talk_items = journal.conferences.get(conference)
+            if talk_items is None:
+                conference_url = normalize_url_with_lang(
+                    f"{args.base_url.rstrip('/')}/study/general-conference/{year}/{month:02d}", "eng"
+                )
+                print(f"Fetching conference page: {conference_url}")
+                try:
+                    talk_items = fetch_talk_items(conference_url, limiter)
+                except Exception as exc:  # noqa: BLE001
+                    print(f"Failed to fetch conference page: {exc}", file=sys.stderr)
+                    failures += 1
+                    continue
+                if not talk_items:
+                    print(f"No talk links found for {conference}.", file=sys.stderr)
+                    failures += 1
+                    continue
+                journal.record({"type": "conference", "conference": conference, "talks": talk_items})
+
+            conference_dir.mkdir(exist_ok=True)
+            todo = [
+                (idx, item)
+                for idx, item in enumerate(talk_items, start=1)
+                if not journal.is_done(conference, item["url"], output_dir)
+            ]
+            print(f"{conference}: {len(talk_items)} talks, {len(talk_items) - len(todo)} already done")
+
+            futures = [fetcher.submit(item["url"]) for _, item in todo]
+            for (idx, item), future in zip(todo, futures):
+                status, dest = write_talk_result(idx, item, future, conference_dir, output, conference)
+                journal.record({
+                    "type": "talk",
+                    "conference": conference,
+                    "index": idx,
+                    "url": item["url"],
+                    "status": status,
+                    "file": str(dest.relative_to(output_dir)) if dest else None,
+                })
+                failures += status == "failed"
+
+    print(f"Done. {failures} failures; re-run the same command to retry them.")
+    return 1 if failures else 0
+
+
+def add_fetch_args(parser: argparse.ArgumentParser) -> None:
     parser.add_argument(
         "--delay-seconds",
         type=float,
         default=0.2,
-        help="Delay between talk requests (default: 0.2)",
+        help="Minimum spacing between requests to one host when --requests-per-second is not set (default: 0.2)",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=None,
+        help="Per-host request rate limit (default: 1 / --delay-seconds)",
+    )
+    parser.add_argument(
+        "--burst",
+        type=int,
+        default=1,
+        help="Requests a host may receive back to back before the rate limit applies (default: 1)",
+    )
+    parser.add_argument(
+        "--max-in-flight",
+        type=int,
+        default=4,
+        help="Maximum concurrent talk requests (default: 4)",
+    )
+    parser.add_argument(
+        "--parse-workers",
+        type=int,
+        default=0,
+        help="Processes that parse talk pages while fetching continues (default: 0, parse in the fetch threads)",
+    )
+    parser.add_argument(
+        "--jsonl",
+        default=None,
+        help="Also append each talk as a JSON record to this corpus file (.jsonl or .jsonl.gz)",
+    )
+    parser.add_argument(
+        "--no-txt",
+        action="store_true",
+        help="Skip the per-talk .txt files (use with --jsonl)",
+    )
+    parser.add_argument(
+        "--http-pool-size",
+        type=int,
+        default=None,
+        help="Keep-alive connections to hold open per crawl (default: --max-in-flight)",
+    )
+    parser.add_argument(
+        "--http-retries",
+        type=int,
+        default=DEFAULT_RETRIES,
+        help=f"Retries for requests that fail to connect (default: {DEFAULT_RETRIES})",
+    )
+    parser.add_argument(
+        "--debug",
+        action="store_true",
+        help="Log connection reuse for every request",
+    )
+    parser.add_argument(
+        "--http-cache-dir",
+        default=None,
+        help="Directory for the conditional-GET page cache (default: ~/.cache/cs301r/http)",
+    )
+    parser.add_argument(
+        "--http-cache-ttl",
+        type=float,
+        default=24 * 3600,
+        help="Seconds a cached page is served without revalidation (default: 86400)",
+    )
+    parser.add_argument(
+        "--no-http-cache",
+        action="store_true",
+        help="Always download pages in full",
+    )
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    argv = sys.argv[1:] if argv is None else argv
+    if argv[:1] == ["backfill"]:
+        parser = argparse.ArgumentParser(
+            prog="download_gc_talks.py backfill",
+            description="Download every conference in a range, resuming from the journal in output_dir.",
+        )
+        parser.add_argument("start", type=parse_conference_id, help="First conference, e.g. 2015-04")
+        parser.add_argument("end", type=parse_conference_id, help="Last conference, e.g. 2025-oct")
+        parser.add_argument("output_dir", help="Directory for per-conference folders and the journal")
+        parser.add_argument(
+            "--base-url",
+            default="https://www.churchofjesuschrist.org",
+            help="Site root to crawl (default: https://www.churchofjesuschrist.org)",
+        )
+        add_fetch_args(parser)
+        args = parser.parse_args(argv[1:])
+        if args.no_txt and not args.jsonl:
+            parser.error("--no-txt requires --jsonl")
+        args.command = "backfill"
+        return args
+
+    parser = argparse.ArgumentParser(description="Download General Conference talks to text files.")
+    parser.add_argument("conference_url", help="Conference page URL to crawl")
+    parser.add_argument("output_dir", help="Directory where .txt files will be written")
+    add_fetch_args(parser)
+    args = parser.parse_args(argv)
+    if args.no_txt and not args.jsonl:
+        parser.error("--no-txt requires --jsonl")
+    args.command = "conference"
+    return args
+
+
+def configure_http_cache(args: argparse.Namespace) -> None:
+    global http_cache
+    if args.no_http_cache:
+        http_cache = None
+    elif args.http_cache_dir:
+        http_cache = HttpCache(args.http_cache_dir, ttl_seconds=args.http_cache_ttl)
+    else:
+        http_cache = HttpCache(ttl_seconds=args.http_cache_ttl)
+
+
+def configure_http_client(args: argparse.Namespace) -> None:
+    global http_client
+    http_client = PooledClient(
+        pool_size=args.http_pool_size or max(1, args.max_in_flight),
+        retries=args.http_retries,
+        headers={"User-Agent": USER_AGENT},
     )
-    return parser.parse_args()
 
 
 def main() -> int:
     args = parse_args()
+    logging.basicConfig(format="%(levelname)s %(name)s: %(message)s")
+    if args.debug:
+        logging.getLogger("shared.http_client").setLevel(logging.DEBUG)
+    configure_http_cache(args)
+    configure_http_client(args)
+    if args.command == "backfill":
+        return backfill(args)
+
     conference_url = normalize_url_with_lang(args.conference_url, "eng")
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
+    limiter = build_limiter(args)
 
     print(f"Fetching conference page: {conference_url}")
     try:
-        conference_html = fetch_html(conference_url)
+        talk_items = fetch_talk_items(conference_url, limiter)
     except Exception as exc:  # noqa: BLE001
         print(f"Failed to fetch conference page: {exc}", file=sys.stderr)
         return 1
 
-    conference_state = extract_initial_state(conference_html)
-    talk_items = extract_talk_items_from_state(conference_state, conference_url)
-    if not talk_items:
-        talk_items = extract_talk_items_from_html(conference_html, conference_url)
-
     if not talk_items:
         print("No talk links found. Check URL or page layout.", file=sys.stderr)
         return 1
@@ -322,34 +910,14 @@ def main() -> int:
     print(f"Found {len(talk_items)} talk links")
 
     success_count = 0
-    for idx, item in enumerate(talk_items, start=1):
-        talk_url = item["url"]
-        default_title = item.get("title", "")
-        default_speaker = item.get("speaker", "")
-        try:
-            talk_html = fetch_html(talk_url)
-            talk_state = extract_initial_state(talk_html)
-            title, speaker, role, paragraphs = extract_talk_from_state(talk_state, talk_url)
-        except Exception as exc:  # noqa: BLE001
-            print(f"[{idx:02d}] Failed: {talk_url} ({exc})", file=sys.stderr)
-            continue
-
-        title = title or default_title or "Untitled Talk"
-        speaker = speaker or default_speaker or "unknown_speaker"
-        role = role or ""
-
-        if not paragraphs:
-            print(f"[{idx:02d}] Skipped (no paragraphs): {talk_url}", file=sys.stderr)
-            continue
-
-        filename = build_output_filename(idx, speaker)
-        dest = output_dir / filename
-        write_talk_file(dest, speaker, role, title, paragraphs)
-        print(f"[{idx:02d}] Wrote {dest.name} ({len(paragraphs)} paragraphs)")
-        success_count += 1
-
-        if args.delay_seconds > 0:
-            time.sleep(args.delay_seconds)
+    conference = conference_id_from_url(conference_url)
+    with TalkFetcher(limiter, args.max_in_flight, args.parse_workers) as fetcher, build_output(args) as output:
+        # Fetches complete in any order; results are consumed in listing order so
+        # numbering and output stay deterministic.
+        futures = [fetcher.submit(item["url"]) for item in talk_items]
+        for idx, (item, future) in enumerate(zip(talk_items, futures), start=1):
+            status, _ = write_talk_result(idx, item, future, output_dir, output, conference)
+            success_count += status == "written"
 
     print(f"Done. Wrote {success_count}/{len(talk_items)} talks to {output_dir}")
     return 0 if success_count else 1
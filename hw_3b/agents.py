@@ -18,7 +18,7 @@ toolbox = ToolBox()
 toolbox.tool(conclude)
 
 
-@toolbox.tool
+@toolbox.tool(max_concurrency=1)  # one prompt on the terminal at a time
 def talk_to_user(message: str):
     """
     Use this function to communicate with the user.
@@ -0,0 +1,123 @@
+"""Micro-benchmark: tool schema generation and argument validation for 100 tools.
+
+Usage:
+    python bench_schema.py [--tools N] [--repeat N]
+
+"cold" clears the schema caches before every round, so it measures the full
+inspect/get_type_hints/schema walk; "cached" is what later lookups cost.
+"""
+import argparse
+import dataclasses
+import inspect
+import statistics
+import time
+from typing import Literal, NotRequired, Optional, TypedDict
+
+import tools
+from tools import ToolBox, compile_validator, generate_function_schema
+
+
+class Source(TypedDict):
+    url: str
+    title: NotRequired[str]
+
+
+@dataclasses.dataclass
+class Task:
+    topic: str
+    sources: list[Source]
+    priority: Literal['low', 'high'] = 'low'
+
+
+SIGNATURES = [
+    {'query': str, 'limit': int},
+    {'query': str, 'lang': Literal['eng', 'spa'], 'strict': Optional[bool]},
+    {'urls': list[str], 'timeout': float},
+    {'task': Task},
+    {'tasks': list[Task], 'weights': dict[str, float]},
+]
+
+ARGUMENTS = [
+    {'query': 'faith', 'limit': '5'},
+    {'query': 'faith', 'lang': 'eng', 'strict': None},
+    {'urls': ['https://a', 'https://b'], 'timeout': 10},
+    {'task': {'topic': 't', 'sources': [{'url': 'u', 'title': None}], 'priority': None}},
+    {'tasks': [{'topic': 't', 'sources': [], 'priority': 'high'}], 'weights': {'a': 1}},
+]
+
+
+def make_tool(i: int):
+    annotations = SIGNATURES[i % len(SIGNATURES)]
+
+    def tool(**kwargs):
+        return kwargs
+
+    tool.__name__ = f'tool_{i}'
+    tool.__doc__ = f'Benchmark tool {i}.'
+    tool.__annotations__ = dict(annotations)
+    tool.__signature__ = inspect.Signature([
+        inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, annotation=ann)
+        for name, ann in annotations.items()
+    ])
+    return tool
+
+
+def clear_caches():
+    generate_function_schema.cache_clear()
+    tools._signature_fields.cache_clear()
+    tools._get_strict_json_schema_type.cache_clear()
+    tools._compile_checker.cache_clear()
+
+
+def timed(fn, repeat: int, before=None) -> float:
+    times = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tools', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    funcs = [make_tool(i) for i in range(args.tools)]
+    toolbox = ToolBox()
+    for func in funcs:
+        toolbox.tool(func)
+    validators = [compile_validator(func) for func in funcs]
+    calls = [ARGUMENTS[i % len(ARGUMENTS)] for i in range(args.tools)]
+    names = [func.__name__ for func in funcs]
+
+    def generate():
+        for func in funcs:
+            generate_function_schema(func)
+
+    def register():
+        box = ToolBox()
+        for func in funcs:
+            box.tool(func)
+
+    def validate():
+        for validator, arguments in zip(validators, calls):
+            validator(arguments)
+
+    rows = [
+        ('schemas, cold', timed(generate, args.repeat, before=clear_caches)),
+        ('schemas, cached', timed(generate, args.repeat)),
+        ('register, cold', timed(register, args.repeat, before=clear_caches)),
+        ('get_tools, cached', timed(lambda: toolbox.get_tools(names), args.repeat)),
+        ('validate arguments', timed(validate, args.repeat)),
+    ]
+    print(f"{args.tools} tools, median of {args.repeat} rounds")
+    for label, seconds in rows:
+        print(f"{label:<20} {seconds * 1e3:>9.3f} ms  {seconds / args.tools * 1e6:>8.2f} us/tool")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,6 @@
 # Copy-paste into agents.py
 
-@toolbox.tool
+@toolbox.tool(max_concurrency=1)  # one prompt on the terminal at a time
 def talk_to_user(message: str):
     """
     Use this function to communicate with the user.
@@ -1,7 +1,14 @@
+import asyncio
+import contextvars
+import dataclasses
+import functools
 import inspect
 import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from types import UnionType
-from typing import Any, Callable, get_type_hints, Literal, get_origin, get_args, Union
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, get_type_hints, is_typeddict, Literal, get_origin, get_args, Union
 
 from openai.types.responses import FunctionToolParam
 
@@ -9,6 +16,10 @@ _tools: dict[str, Callable] = {}
 logger = logging.getLogger(__name__)
 
 
+class ToolArgumentError(ValueError):
+    """The model called a tool with arguments that don't match its signature."""
+
+
 def _get_schema_type(_type: str):
     type_map = {
         'str': "string",
@@ -29,6 +40,52 @@ def _is_optional(annotation) -> bool:
     return (origin is UnionType or origin is Union) and type(None) in args
 
 
+def _object_fields(annotation) -> tuple[dict[str, Any], set[str]]:
+    """Field annotations of a TypedDict or dataclass, and the names the caller may leave out."""
+    hints = get_type_hints(annotation)
+    if is_typeddict(annotation):
+        return hints, set(annotation.__optional_keys__)
+    fields = [field for field in dataclasses.fields(annotation) if field.init]
+    optional = {
+        field.name
+        for field in fields
+        if field.default is not dataclasses.MISSING or field.default_factory is not dataclasses.MISSING
+    }
+    return {field.name: hints[field.name] for field in fields}, optional
+
+
+def _is_object_type(annotation) -> bool:
+    return is_typeddict(annotation) or (isinstance(annotation, type) and dataclasses.is_dataclass(annotation))
+
+
+def _object_schema(annotation) -> dict:
+    # Strict mode wants every property listed as required; fields that may be left
+    # out accept null instead, and null falls back to the default when coercing
+    hints, optional = _object_fields(annotation)
+    properties = {}
+    for name, ann in hints.items():
+        schema = _get_strict_json_schema_type(ann)
+        properties[name] = {"anyOf": [schema, {"type": "null"}]} if name in optional else schema
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(hints),
+        "additionalProperties": False,
+    }
+
+
+def _supports_strict(schema) -> bool:
+    """Strict mode has no way to express free-form keys, i.e. an additionalProperties schema."""
+    if isinstance(schema, dict):
+        if isinstance(schema.get("additionalProperties"), dict):
+            return False
+        return all(_supports_strict(value) for value in schema.values())
+    if isinstance(schema, list):
+        return all(_supports_strict(value) for value in schema)
+    return True
+
+
+@functools.cache
 def _get_strict_json_schema_type(annotation) -> dict:
     origin = get_origin(annotation)
     args = get_args(annotation)
@@ -39,12 +96,25 @@ def _get_strict_json_schema_type(annotation) -> dict:
             return _get_strict_json_schema_type(non_none_args[0])
         raise TypeError(f"Unsupported Union with multiple non-None values: {annotation}")
 
-    if result := _get_schema_type(str(annotation.__name__)):
+    if result := _get_schema_type(str(getattr(annotation, '__name__', ''))):
         return result
 
-    if result := _get_schema_type(str(origin.__name__)):
+    if result := _get_schema_type(str(getattr(origin, '__name__', ''))):
         return result
 
+    if origin in (list, Sequence):
+        if len(args) != 1:
+            raise TypeError(f"List parameters need an item type: {annotation}")
+        return {"type": "array", "items": _get_strict_json_schema_type(args[0])}
+
+    if origin in (dict, Mapping):
+        if not args or args[0] is not str:
+            raise TypeError(f"Only dict[str, ...] is supported: {annotation}")
+        return {"type": "object", "additionalProperties": _get_strict_json_schema_type(args[1])}
+
+    if _is_object_type(annotation):
+        return _object_schema(annotation)
+
     if origin is Literal:
         values = args
         if all(isinstance(v, (str, int, bool)) for v in values):
@@ -54,13 +124,13 @@ def _get_strict_json_schema_type(annotation) -> dict:
     raise TypeError(f"Unsupported parameter type: {annotation}")
 
 
-def _inspect_signature(func):
+@functools.cache
+def _signature_fields(func) -> tuple[tuple[str, Any, bool], ...]:
+    """(name, annotation, has_default) per parameter; signatures are inspected once per function."""
     sig = inspect.signature(func)
     type_hints = get_type_hints(func)
 
-    params = {}
-    required = []
-
+    fields = []
     for name, param in sig.parameters.items():
         if name in {"self", "ctx"}:
             continue
@@ -68,7 +138,15 @@ def _inspect_signature(func):
         ann = type_hints.get(name, param.annotation)
         if ann is inspect._empty:
             raise TypeError(f"Missing type annotation for parameter: {name}")
+        fields.append((name, ann, param.default is not inspect.Parameter.empty))
+    return tuple(fields)
+
 
+def _inspect_signature(func):
+    params = {}
+    required = []
+
+    for name, ann, _ in _signature_fields(func):
         schema_entry = _get_strict_json_schema_type(ann)
 
         required.append(name)
@@ -90,6 +168,7 @@ def _parse_signature(signature: str):
     return params, required
 
 
+@functools.cache
 def generate_function_schema(func: Callable[..., Any]) -> FunctionToolParam:
     params, required = _inspect_signature(func)
 
@@ -103,39 +182,267 @@ def generate_function_schema(func: Callable[..., Any]) -> FunctionToolParam:
             "required": required,
             "additionalProperties": False
         },
-        "strict": True
+        "strict": _supports_strict(params)
     }
 
 
+def _check_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    raise TypeError(f"expected an integer, got {type(value).__name__}")
+
+
+def _check_float(value):
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if isinstance(value, str):
+        return float(value.strip())
+    raise TypeError(f"expected a number, got {type(value).__name__}")
+
+
+def _check_bool(value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.strip().lower() in ("true", "false"):
+        return value.strip().lower() == "true"
+    raise TypeError(f"expected a boolean, got {type(value).__name__}")
+
+
+def _check_str(value):
+    if isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return str(value)
+    raise TypeError(f"expected a string, got {type(value).__name__}")
+
+
+_CHECKERS = {'str': _check_str, 'int': _check_int, 'float': _check_float, 'bool': _check_bool}
+
+
+def _compile_object_checker(annotation) -> Callable[[Any], Any]:
+    hints, optional = _object_fields(annotation)
+    fields = [(name, _compile_checker(ann), name in optional) for name, ann in hints.items()]
+    build = dict if is_typeddict(annotation) else annotation
+    type_name = annotation.__name__
+
+    def check_object(value):
+        if not isinstance(value, dict):
+            raise TypeError(f"expected an object for {type_name}, got {type(value).__name__}")
+        if unknown := value.keys() - hints.keys():
+            raise ValueError(f"unexpected field(s) for {type_name}: {', '.join(sorted(unknown))}")
+        result = {}
+        for name, check, may_omit in fields:
+            field_value = value.get(name)
+            if field_value is None and may_omit:
+                continue
+            if name not in value:
+                raise ValueError(f"missing field for {type_name}: {name}")
+            try:
+                result[name] = check(field_value)
+            except (TypeError, ValueError) as exc:
+                raise type(exc)(f"{name}: {exc}") from None
+        return build(**result)
+    return check_object
+
+
+@functools.cache
+def _compile_checker(annotation) -> Callable[[Any], Any]:
+    """A function that returns the value coerced to `annotation` or raises TypeError/ValueError."""
+    if _is_optional(annotation):
+        inner = _compile_checker(next(arg for arg in get_args(annotation) if arg is not type(None)))
+        return lambda value: None if value is None else inner(value)
+
+    origin = get_origin(annotation)
+    if origin in (list, Sequence):
+        check_item = _compile_checker(get_args(annotation)[0])
+
+        def check_list(value):
+            if not isinstance(value, list):
+                raise TypeError(f"expected an array, got {type(value).__name__}")
+            return [check_item(item) for item in value]
+        return check_list
+
+    if origin in (dict, Mapping):
+        check_value = _compile_checker(get_args(annotation)[1])
+
+        def check_dict(value):
+            if not isinstance(value, dict):
+                raise TypeError(f"expected an object, got {type(value).__name__}")
+            return {key: check_value(item) for key, item in value.items()}
+        return check_dict
+
+    if _is_object_type(annotation):
+        return _compile_object_checker(annotation)
+
+    if get_origin(annotation) is Literal:
+        allowed = get_args(annotation)
+
+        def check_literal(value):
+            if value in allowed:
+                return value
+            raise ValueError(f"expected one of {list(allowed)}, got {value!r}")
+        return check_literal
+
+    if checker := _CHECKERS.get(getattr(annotation, '__name__', '')):
+        return checker
+
+    return lambda value: value
+
+
+def compile_validator(func) -> Callable[[dict], dict]:
+    """Build a validator that checks and coerces a tool's JSON arguments against its signature."""
+    fields = [
+        (name, _compile_checker(ann), has_default)
+        for name, ann, has_default in _signature_fields(func)
+    ]
+    known = {name for name, _, _ in fields}
+
+    def validate(arguments: dict) -> dict:
+        if unknown := arguments.keys() - known:
+            raise ToolArgumentError(f"unexpected argument(s): {', '.join(sorted(unknown))}")
+        result = {}
+        for name, check, has_default in fields:
+            if name not in arguments:
+                if has_default:
+                    continue
+                raise ToolArgumentError(f"missing argument: {name}")
+            try:
+                result[name] = check(arguments[name])
+            except (TypeError, ValueError) as exc:
+                raise ToolArgumentError(f"{name}: {exc}") from None
+        return result
+
+    return validate
+
+
+class _Slot:
+    """
+    One held unit of a tool's max_concurrency semaphore. Released once: when the call
+    returns, or, for a sync tool that timed out, when its worker thread finishes.
+    """
+
+    def __init__(self, semaphore: asyncio.Semaphore | None):
+        self._semaphore = semaphore
+        self._loop = asyncio.get_running_loop()
+        self.handed_off = False  # the worker thread releases it
+
+    def release(self) -> None:
+        if self._semaphore is not None:
+            self._semaphore.release()
+            self._semaphore = None
+
+    def release_from_thread(self, _future=None) -> None:
+        try:
+            self._loop.call_soon_threadsafe(self.release)
+        except RuntimeError:
+            pass  # the event loop is closed; its semaphores are gone with it
+
+
 class ToolBox:
-    _tools: list[FunctionToolParam]
+    _tools: dict[str, FunctionToolParam]
 
-    def __init__(self):
+    def __init__(self, max_workers: int = 8):
         self._funcs = {}
-        self._tools = []
-
-    def tool(self, func):
+        self._tools = {}  # name -> schema, in registration order
+        self._validators: dict[str, Callable[[dict], dict]] = {}
+        self._tool_lists: dict[tuple[str, ...], list[FunctionToolParam]] = {}
+        self._limits: dict[str, int] = {}  # name -> max_concurrency
+        # Semaphores are bound to the event loop they are used on, so each loop
+        # (e.g. each asyncio.run) gets its own set
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[str, asyncio.Semaphore]] = (
+            weakref.WeakKeyDictionary()
+        )
+        self._timeouts: dict[str, float] = {}
+        # Sync tools run here so a blocking call (input(), HTTP) doesn't stall sibling agents
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tool')
+
+    def tool(self, func=None, *, max_concurrency: int | None = None, timeout: float | None = None):
+        """
+        Register a tool. Usable as @toolbox.tool or @toolbox.tool(max_concurrency=1, timeout=30).
+        max_concurrency caps how many calls of this tool run at once across all agents;
+        a call running longer than timeout seconds is cancelled and reported to the model.
+        """
+        if func is None:
+            return functools.partial(self.tool, max_concurrency=max_concurrency, timeout=timeout)
         self._funcs[func.__name__] = func
-        self._tools.append(generate_function_schema(func))
+        self._validators[func.__name__] = compile_validator(func)
+        if max_concurrency is not None:
+            self._limits[func.__name__] = max_concurrency
+        if timeout is not None:
+            self._timeouts[func.__name__] = timeout
+        self._tools[func.__name__] = generate_function_schema(func)
+        self._tool_lists.clear()
         return func
 
     def get_tools(self, tool_names: list[str]) -> list[FunctionToolParam]:
+        # run_agent asks for the same agent's tools on every turn
+        key = tuple(tool_names)
+        if (tls := self._tool_lists.get(key)) is not None:
+            return tls
+
+        wanted = set(tool_names)
         tls = [
             tool
-            for tool in self._tools
-            if tool['name'] in tool_names
+            for name, tool in self._tools.items()
+            if name in wanted
         ]
-        if 'web_search' in tool_names:
+        if 'web_search' in wanted:
             # noinspection PyTypeChecker
             tls.append({'type': 'web_search'})
+        self._tool_lists[key] = tls
         return tls
 
+    def _semaphore(self, tool_name: str) -> asyncio.Semaphore | None:
+        if (limit := self._limits.get(tool_name)) is None:
+            return None
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        if (semaphore := semaphores.get(tool_name)) is None:
+            semaphore = semaphores[tool_name] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def _call(self, tool, kwargs, slot: _Slot):
+        if inspect.iscoroutinefunction(tool):
+            return await tool(**kwargs)
+        # copy_context keeps contextvars such as run_agent.current_agent visible in the thread
+        context = contextvars.copy_context()
+        future = self._executor.submit(context.run, tool, **kwargs)
+        # A timeout can't stop the thread, so it keeps the tool's slot until it is done
+        slot.handed_off = True
+        future.add_done_callback(slot.release_from_thread)
+        result = await asyncio.wrap_future(future)
+        if inspect.iscoroutine(result):
+            result = await result
+        return result
+
     async def run_tool(self, tool_name: str, **kwargs):
         logger.debug('TOOL %s(%s)', tool_name, kwargs)
         tool = self._funcs.get(tool_name)
-        result = tool(**kwargs)
-        if inspect.iscoroutine(result):
-            result = await result
+        if tool is None:
+            return f'Error: there is no tool named {tool_name}.'
+        try:
+            kwargs = self._validators[tool_name](kwargs)
+        except ToolArgumentError as exc:
+            # Goes back to the model as the tool output so it can retry the call
+            logger.debug('TOOL %s(%s) rejected: %s', tool_name, kwargs, exc)
+            return f'Error: invalid arguments for {tool_name}: {exc}'
+        timeout = self._timeouts.get(tool_name)
+        semaphore = self._semaphore(tool_name)
+        if semaphore is not None:
+            await semaphore.acquire()
+        slot = _Slot(semaphore)
+        try:
+            result = await asyncio.wait_for(self._call(tool, kwargs, slot), timeout)
+        except TimeoutError:
+            # A sync tool's thread can't be interrupted; it finishes in the background
+            logger.warning('TOOL %s(%s) timed out after %s seconds', tool_name, kwargs, timeout)
+            result = f'Error: {tool_name} did not finish within {timeout} seconds.'
+        finally:
+            if not slot.handed_off:
+                slot.release()
 
         logger.debug('TOOL %s(%s) -> %s', tool_name, kwargs, result)
         return result
@@ -0,0 +1,148 @@
+# On-disk embedding cache shared by the chunking and Chroma experiments.
+#
+# Vectors are stored as float32 blobs in SQLite, keyed by (model, sha256(text)).
+# The cache is capped at `max_entries`; the least recently used rows are evicted first.
+# Several processes may share the file, so the row count is read from the table
+# whenever it may have grown, never tracked in memory.
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from functools import cache
+from pathlib import Path
+from typing import Awaitable, Callable, Sequence
+
+import numpy as np
+
+DEFAULT_PATH = Path.home() / ".cache" / "cs301r" / "embeddings.sqlite3"
+DEFAULT_MAX_ENTRIES = 500_000
+
+# SQLite's default limit on bound parameters is 999 on older builds
+_LOOKUP_BATCH = 500
+
+
+def _text_key(text: str) -> bytes:
+    return hashlib.sha256(text.encode("utf-8")).digest()
+
+
+class EmbeddingCache:
+    def __init__(self, path: str | Path = DEFAULT_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL,"
+            " text_hash BLOB NOT NULL,"
+            " vector BLOB NOT NULL,"
+            " last_used REAL NOT NULL,"
+            " PRIMARY KEY (model, text_hash))"
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS embeddings_lru ON embeddings (last_used)")
+
+    def get_many(self, model: str, texts: Sequence[str], now: float | None = None) -> list[np.ndarray | None]:
+        now = time.time() if now is None else now
+        keys = [_text_key(t) for t in texts]
+        found: dict[bytes, np.ndarray] = {}
+        with self._lock:
+            for i in range(0, len(keys), _LOOKUP_BATCH):
+                batch = list(set(keys[i:i + _LOOKUP_BATCH]))
+                marks = ",".join("?" * len(batch))
+                rows = self._db.execute(
+                    f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({marks})",
+                    [model, *batch],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = np.frombuffer(blob, dtype=np.float32)
+                if rows:
+                    self._db.execute(
+                        f"UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash IN ({marks})",
+                        [now, model, *batch],
+                    )
+            self._db.commit()
+
+        result = [found.get(k) for k in keys]
+        hits = sum(v is not None for v in result)
+        self.hits += hits
+        self.misses += len(result) - hits
+        return result
+
+    def put_many(self, model: str, texts: Sequence[str], vectors: Sequence, now: float | None = None) -> None:
+        """Insert new rows stamped `now`; rows used at or after `now` are never evicted by this call."""
+        now = time.time() if now is None else now
+        rows = [
+            (model, _text_key(t), np.asarray(v, dtype=np.float32).tobytes(), now)
+            for t, v in zip(texts, vectors)
+        ]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.executemany(
+                "INSERT OR IGNORE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            if self._db.total_changes > before:
+                count = self._db.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+                if count > self.max_entries:
+                    self._db.execute(
+                        "DELETE FROM embeddings WHERE rowid IN "
+                        "(SELECT rowid FROM embeddings WHERE last_used < ? ORDER BY last_used LIMIT ?)",
+                        (now, count - self.max_entries),
+                    )
+            self._db.commit()
+
+    def _split(self, model: str, texts: Sequence[str], now: float) -> tuple[list[np.ndarray | None], list[str]]:
+        cached = self.get_many(model, texts, now)
+        # dict.fromkeys keeps order and embeds repeated texts only once
+        missing = list(dict.fromkeys(t for t, v in zip(texts, cached) if v is None))
+        return cached, missing
+
+    def _merge(self, model, texts, cached, missing, computed, now) -> list[np.ndarray]:
+        computed = [np.asarray(v, dtype=np.float32) for v in computed]
+        self.put_many(model, missing, computed, now)
+        by_text = dict(zip(missing, computed))
+        return [v if v is not None else by_text[t] for t, v in zip(texts, cached)]
+
+    def embed(
+            self,
+            model: str,
+            texts: Sequence[str],
+            compute: Callable[[list[str]], Sequence],
+    ) -> list[np.ndarray]:
+        """Return embeddings for `texts`, calling `compute` only for texts not in the cache."""
+        # One timestamp for the rows read and written, so eviction can't drop the hits
+        now = time.time()
+        cached, missing = self._split(model, texts, now)
+        computed = compute(missing) if missing else []
+        return self._merge(model, texts, cached, missing, computed, now)
+
+    async def aembed(
+            self,
+            model: str,
+            texts: Sequence[str],
+            compute: Callable[[list[str]], Awaitable[Sequence]],
+    ) -> list[np.ndarray]:
+        now = time.time()
+        cached, missing = self._split(model, texts, now)
+        computed = await compute(missing) if missing else []
+        return self._merge(model, texts, cached, missing, computed, now)
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+@cache
+def get_embedding_cache() -> EmbeddingCache:
+    """Process-wide cache; EMBEDDING_CACHE_PATH / EMBEDDING_CACHE_MAX_ENTRIES override the defaults."""
+    return EmbeddingCache(
+        os.getenv("EMBEDDING_CACHE_PATH", DEFAULT_PATH),
+        int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+    )
@@ -0,0 +1,162 @@
+# On-disk HTTP cache with conditional revalidation, shared by the GC scrapers.
+#
+# Bodies are stored with their ETag / Last-Modified. Within `ttl_seconds` of the last
+# validation a URL is served straight from disk; after that it is revalidated with
+# If-None-Match / If-Modified-Since and a 304 is answered from disk. The cache is
+# transport-agnostic: callers pass a `send(extra_headers)` function that performs the
+# actual GET with whatever client they use and returns (status, headers, body).
+import hashlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from email.message import Message
+from pathlib import Path
+from typing import Callable, Mapping
+
+DEFAULT_DIR = Path.home() / ".cache" / "cs301r" / "http"
+DEFAULT_TTL_SECONDS = 3600
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+Send = Callable[[dict[str, str]], tuple[int, Mapping[str, str], bytes]]
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int
+    headers: dict[str, str]
+    body: bytes
+    from_cache: bool  # True when no body was transferred (fresh hit or 304)
+
+    @property
+    def charset(self) -> str | None:
+        msg = Message()
+        msg["content-type"] = self.headers.get("content-type", "")
+        return msg.get_content_charset()
+
+    def text(self, default_charset: str = "utf-8") -> str:
+        return self.body.decode(self.charset or default_charset, errors="replace")
+
+
+def _file_size(path: Path) -> int:
+    try:
+        return path.stat().st_size
+    except FileNotFoundError:
+        return 0
+
+
+class HttpCache:
+    def __init__(
+            self,
+            directory: str | Path = DEFAULT_DIR,
+            ttl_seconds: float = DEFAULT_TTL_SECONDS,
+            max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.directory = Path(directory).expanduser()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.hits = 0  # served without a body transfer
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._total_bytes: int | None = None  # computed on first store
+
+    def _paths(self, url: str) -> tuple[Path, Path]:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / f"{key}.json", self.directory / f"{key}.body"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes) -> None:
+        tmp = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+
+    def _load(self, url: str) -> tuple[dict, bytes] | None:
+        meta_path, body_path = self._paths(url)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, json.JSONDecodeError):
+            return None
+        if meta.get("url") != url or len(body) != meta.get("size"):
+            return None
+        return meta, body
+
+    def _touch(self, url: str, meta: dict) -> None:
+        meta["validated_at"] = time.time()
+        meta_path, _ = self._paths(url)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def _store(self, url: str, headers: dict[str, str], body: bytes) -> None:
+        meta_path, body_path = self._paths(url)
+        # Either file may be missing: a crash between the two writes, or a separate eviction
+        previous = _file_size(meta_path) + _file_size(body_path)
+        meta = {
+            "url": url,
+            "etag": headers.get("etag"),
+            "last_modified": headers.get("last-modified"),
+            "content_type": headers.get("content-type"),
+            "size": len(body),
+            "validated_at": time.time(),
+        }
+        self._write_atomic(body_path, body)
+        self._write_atomic(meta_path, json.dumps(meta).encode("utf-8"))
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = self._disk_usage()
+            else:
+                self._total_bytes += _file_size(meta_path) + len(body) - previous
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _disk_usage(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.directory) if entry.is_file())
+
+    def _evict(self) -> None:
+        # Least recently validated entries go first, down to 90% of the cap
+        metas = sorted(self.directory.glob("*.json"), key=lambda p: p.stat().st_mtime)
+        target = int(self.max_bytes * 0.9)
+        for meta_path in metas:
+            if self._total_bytes <= target:
+                break
+            body_path = meta_path.with_suffix(".body")
+            for path in (meta_path, body_path):
+                try:
+                    self._total_bytes -= path.stat().st_size
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def fetch(self, url: str, send: Send) -> CachedResponse:
+        cached = self._load(url)
+        if cached:
+            meta, body = cached
+            headers = {"content-type": meta.get("content_type") or ""}
+            if time.time() - meta["validated_at"] < self.ttl_seconds:
+                self.hits += 1
+                return CachedResponse(url, 200, headers, body, from_cache=True)
+
+            conditional = {}
+            if meta.get("etag"):
+                conditional["If-None-Match"] = meta["etag"]
+            if meta.get("last_modified"):
+                conditional["If-Modified-Since"] = meta["last_modified"]
+            if conditional:
+                status, resp_headers, resp_body = send(conditional)
+                if status == 304:
+                    self.hits += 1
+                    self._touch(url, meta)
+                    return CachedResponse(url, 200, headers, body, from_cache=True)
+                return self._handle(url, status, resp_headers, resp_body)
+
+        return self._handle(url, *send({}))
+
+    def _handle(self, url: str, status: int, headers: Mapping[str, str], body: bytes) -> CachedResponse:
+        self.misses += 1
+        headers = {k.lower(): v for k, v in headers.items()}
+        if status == 200 and "no-store" not in headers.get("cache-control", ""):
+            self._store(url, headers, body)
+        return CachedResponse(url, status, headers, body, from_cache=False)
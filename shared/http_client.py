@@ -0,0 +1,153 @@
+# Pooled keep-alive HTTP clients shared by the GC scraping tools.
+#
+# One httpx client per process keeps connections to churchofjesuschrist.org open, so
+# repeated tool calls and crawls skip DNS + TCP + TLS setup. httpx already ships with
+# the openai package. Failed connection attempts are retried by the transport; each
+# request is traced so the debug log shows how often a pooled connection was reused.
+import logging
+import os
+import threading
+from functools import cache
+from typing import Mapping
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_RETRIES = 2
+DEFAULT_TIMEOUT = 15.0
+USER_AGENT = "cs301r-gc-tools/1.0"
+
+
+class ConnectionStats:
+    """Counts requests that opened a new connection vs. reused a pooled one."""
+
+    def __init__(self):
+        self.opened = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    def record(self, url: str, opened: bool) -> None:
+        with self._lock:
+            if opened:
+                self.opened += 1
+            else:
+                self.reused += 1
+            opened_total, reused_total = self.opened, self.reused
+        logger.debug(
+            "%s connection for %s (opened=%d reused=%d)",
+            "new" if opened else "reused", httpx.URL(url).host, opened_total, reused_total,
+        )
+
+
+def _limits(pool_size: int) -> httpx.Limits:
+    return httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+
+
+def _is_connect(event_name: str) -> bool:
+    return event_name == "connection.connect_tcp.complete"
+
+
+class PooledClient:
+    def __init__(
+            self,
+            pool_size: int = DEFAULT_POOL_SIZE,
+            retries: int = DEFAULT_RETRIES,
+            timeout: float = DEFAULT_TIMEOUT,
+            headers: Mapping[str, str] | None = None,
+    ):
+        self.stats = ConnectionStats()
+        self._client = httpx.Client(
+            # limits and retries live on the transport when one is passed explicitly
+            transport=httpx.HTTPTransport(limits=_limits(pool_size), retries=retries),
+            timeout=timeout,
+            headers={"User-Agent": USER_AGENT, **(headers or {})},
+            follow_redirects=True,
+        )
+
+    def get(self, url: str, headers: Mapping[str, str] | None = None, timeout: float | None = None) -> httpx.Response:
+        opened = False
+
+        def trace(event_name, info):
+            nonlocal opened
+            opened = opened or _is_connect(event_name)
+
+        response = self._client.get(
+            url,
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            extensions={"trace": trace},
+        )
+        self.stats.record(url, opened)
+        return response
+
+    def close(self) -> None:
+        self._client.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class AsyncPooledClient:
+    """
+    Async counterpart of PooledClient. httpx async clients are bound to the event loop
+    they first run on, so open one per loop, e.g. `async with AsyncPooledClient() as client`.
+    """
+
+    def __init__(
+            self,
+            pool_size: int = DEFAULT_POOL_SIZE,
+            retries: int = DEFAULT_RETRIES,
+            timeout: float = DEFAULT_TIMEOUT,
+            headers: Mapping[str, str] | None = None,
+    ):
+        self.stats = ConnectionStats()
+        self._client = httpx.AsyncClient(
+            transport=httpx.AsyncHTTPTransport(limits=_limits(pool_size), retries=retries),
+            timeout=timeout,
+            headers={"User-Agent": USER_AGENT, **(headers or {})},
+            follow_redirects=True,
+        )
+
+    async def get(self, url: str, headers: Mapping[str, str] | None = None, timeout: float | None = None) -> httpx.Response:
+        opened = False
+
+        async def trace(event_name, info):
+            nonlocal opened
+            opened = opened or _is_connect(event_name)
+
+        response = await self._client.get(
+            url,
+            headers=headers,
+            timeout=timeout if timeout is not None else httpx.USE_CLIENT_DEFAULT,
+            extensions={"trace": trace},
+        )
+        self.stats.record(url, opened)
+        return response
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.aclose()
+
+
+def _env_settings() -> dict:
+    return dict(
+        pool_size=int(os.getenv("HTTP_POOL_SIZE", DEFAULT_POOL_SIZE)),
+        retries=int(os.getenv("HTTP_RETRIES", DEFAULT_RETRIES)),
+        timeout=float(os.getenv("HTTP_TIMEOUT", DEFAULT_TIMEOUT)),
+    )
+
+
+@cache
+def get_http_client() -> PooledClient:
+    """Process-wide client; HTTP_POOL_SIZE / HTTP_RETRIES / HTTP_TIMEOUT override the defaults."""
+    return PooledClient(**_env_settings())